@@ -0,0 +1,223 @@
+import argparse
+from kode import spanize, tokenize, lex, statementize, parse_tokens, parse_cached, optimize, ENGINES, BufferSink, StreamSink, NullSink, FileSource
+import os
+import sys
+import tempfile
+import time
+
+STATEMENT_TEMPLATES = [
+    "SET X{i} TO {i} PLUS 2 TIMES X{j}.",
+    "SET S{i} TO \"value {i}\" PLUS -{i}.5.",
+    "IF X{j} GREATER THAN {i} AND TRUE THEN SET Y TO X{j} SHL 1. ELSE SET Y TO NONE. END",
+    "WHILE X{j} LESS THAN {i} DO SET X{j} TO X{j} PLUS 1. END",
+    "SHOW X{j} MOD 7 EQUALS 0.",
+]
+
+def generate_source(lines: int) -> str:
+    source = ["SET X0 TO 0."]
+
+    for i in range(1, lines):
+        template = STATEMENT_TEMPLATES[i % len(STATEMENT_TEMPLATES)]
+        source.append(template.format(i=i, j=i // 2))
+
+    return "\n".join(source) + "\n"
+
+def measure(function, *args) -> float:
+    start_time = time.perf_counter()
+    function(*args)
+
+    return time.perf_counter() - start_time
+
+def bench_lex(args):
+    print(f"{'lines':>10} {'lex (s)':>10} {'us/line':>10} {'spanize+tokenize (s)':>22}")
+
+    for lines in args.sizes:
+        source = generate_source(lines)
+        lex_time = measure(lex, source, "bench")
+
+        if lines <= args.baseline_max:
+            baseline = f"{measure(lambda: tokenize(spanize(source, 'bench'))):>22.4f}"
+        else:
+            baseline = f"{'skipped':>22}"
+
+        print(f"{lines:>10} {lex_time:>10.4f} {lex_time / lines * 1e6:>10.2f} {baseline}")
+
+def generate_chain(length: int) -> str:
+    return "SHOW 1" + " PLUS 1 TIMES 2" * length + ".\n"
+
+def generate_nested(depth: int) -> str:
+    body = "SET X TO X PLUS 1. SHOW X. " * 20
+
+    return "WHILE X LESS THAN 1 DO IF TRUE THEN " * depth + body + "END END " * depth + "\n"
+
+def bench_parse(args):
+    print(f"{'lines':>10} {'parser (s)':>12} {'us/line':>10} {'statementize (s)':>18}")
+
+    for lines in args.sizes:
+        tokens = lex(generate_source(lines), "bench")
+        parse_time = measure(parse_tokens, tokens)
+
+        if lines <= args.baseline_max:
+            baseline = f"{measure(statementize, tokens.copy()):>18.4f}"
+        else:
+            baseline = f"{'skipped':>18}"
+
+        print(f"{lines:>10} {parse_time:>12.4f} {parse_time / lines * 1e6:>10.2f} {baseline}")
+
+    print()
+    print(f"{'operators':>10} {'parser (s)':>12} {'statementize (s)':>18}")
+
+    for length in args.chains:
+        tokens = lex(generate_chain(length), "bench")
+        parse_time = measure(parse_tokens, tokens)
+
+        if length <= args.chain_baseline_max:
+            baseline = f"{measure(statementize, tokens.copy()):>18.4f}"
+        else:
+            baseline = f"{'skipped':>18}"
+
+        print(f"{length * 2:>10} {parse_time:>12.4f} {baseline}")
+
+    print()
+    print(f"{'depth':>10} {'parser (s)':>12} {'statementize (s)':>18}")
+
+    for depth in args.depths:
+        tokens = lex(generate_nested(depth), "bench")
+        parse_time = measure(parse_tokens, tokens)
+        baseline = measure(statementize, tokens.copy())
+
+        print(f"{depth * 2:>10} {parse_time:>12.4f} {baseline:>18.4f}")
+
+def bench_output(args):
+    sinks = {
+        "buffer": lambda: BufferSink(),
+        "stream": lambda: StreamSink(open(os.devnull, "w")),
+        "null": lambda: NullSink()
+    }
+
+    print(f"{'lines':>10} " + " ".join(f"{name + ' (s)':>12}" for name in sinks))
+
+    for lines in args.sizes:
+        ast = parse_tokens(lex(f"SET I TO 0. WHILE I LESS THAN {lines} DO SHOW I. SET I TO I PLUS 1. END", "bench"))
+        times = []
+
+        for sink in sinks.values():
+            output = sink()
+            interpreter = ENGINES[args.engine](ast, output=output)
+            times.append(measure(lambda: (interpreter.run(), output.flush(), output.value)))
+
+        print(f"{lines:>10} " + " ".join(f"{t:>12.4f}" for t in times))
+
+def bench_input(args):
+    print(f"{'lines':>10} {'FileSource (s)':>16} {'input (s)':>12}")
+
+    for lines in args.sizes:
+        ast = parse_tokens(lex(f"SET I TO 0. WHILE I LESS THAN {lines} DO SET X TO INPUT. SET I TO I PLUS 1. END", "bench"))
+        times = []
+
+        with tempfile.TemporaryFile("w+") as h:
+            h.write("".join(f"{i}\n" for i in range(lines)))
+
+            for source in [lambda: FileSource(h), lambda: input]:
+                h.seek(0)
+                stdin, sys.stdin = sys.stdin, h
+
+                try:
+                    interpreter = ENGINES[args.engine](ast, input_method=source(), output=NullSink())
+                    times.append(measure(interpreter.run))
+                finally:
+                    sys.stdin = stdin
+
+        print(f"{lines:>10} {times[0]:>16.4f} {times[1]:>12.4f}")
+
+def bench_cache(args):
+    print(f"{'lines':>10} {'parse (s)':>12} {'cold (s)':>10} {'warm (s)':>10} {'kodec (KB)':>12}")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for lines in args.sizes:
+            source = generate_source(lines)
+            file_path = os.path.join(cache_dir, f"bench{lines}.kode")
+
+            parse_time = measure(lambda: parse_tokens(lex(source, file_path)))
+            cold_time = measure(parse_cached, source, file_path)
+            warm_time = measure(parse_cached, source, file_path)
+            size = os.path.getsize(file_path + "c") / 1024
+
+            print(f"{lines:>10} {parse_time:>12.4f} {cold_time:>10.4f} {warm_time:>10.4f} {size:>12.1f}")
+
+def generate_constants(iterations: int) -> str:
+    return "\n".join([
+        "SET SIZE TO 16.",
+        "SET CELLS TO SIZE TIMES SIZE.",
+        "SET WIDTH TO 0.",
+        "SET WIDTH TO WIDTH PLUS SIZE.",
+        "SET I TO 0.",
+        f"WHILE I LESS THAN CELLS TIMES {iterations} DIVIDE 256 DO",
+        "    SET X TO I MOD SIZE PLUS 1 SHL 3 TIMES 2.",
+        "    SET Y TO I DIVIDE SIZE MOD SIZE PLUS SIZE MINUS 1.",
+        "    SET V TO I MOD SIZE TIMES SIZE PLUS I DIVIDE SIZE.",
+        "    SET Z TO WIDTH TIMES WIDTH MINUS WIDTH MOD 3 PLUS I.",
+        "    SET I TO I PLUS 1.",
+        "END",
+    ]) + "\n"
+
+def bench_opt(args):
+    source = generate_constants(args.iterations)
+
+    print(f"{'engine':>10} {'no-opt (s)':>12} {'opt (s)':>10} {'speedup':>10}")
+
+    for engine in args.engines:
+        times = []
+
+        # Each column parses its own tree, so neither run sees nodes the other one ran or optimized.
+        for optimized in [False, True]:
+            program = parse_tokens(lex(source, "bench"))
+
+            if optimized: program = optimize(program)
+
+            interpreter = ENGINES[engine](program, output=NullSink())
+            times.append(measure(interpreter.run))
+
+        print(f"{engine:>10} {times[0]:>12.4f} {times[1]:>10.4f} {times[0] / times[1]:>9.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Kode")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    lex_parser = subparsers.add_parser("lex", help="Compares the lexer to spanize and tokenize.")
+    lex_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000, 200000], help="Number of generated lines per run.")
+    lex_parser.add_argument("--baseline-max", type=int, default=4000, help="Largest size the quadratic baseline is run on.")
+    lex_parser.set_defaults(function=bench_lex)
+
+    parse_parser = subparsers.add_parser("parse", help="Compares the parser to statementize.")
+    parse_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Number of generated lines per run.")
+    parse_parser.add_argument("--baseline-max", type=int, default=10000, help="Largest size statementize is run on.")
+    parse_parser.add_argument("--chains", type=int, nargs="+", default=[100, 200, 400, 2000], help="Number of operator pairs in a single generated expression.")
+    parse_parser.add_argument("--chain-baseline-max", type=int, default=400, help="Longest chain statementize is run on.")
+    parse_parser.add_argument("--depths", type=int, nargs="+", default=[4, 16, 64], help="Number of nested WHILE and IF pairs around a generated body.")
+    parse_parser.set_defaults(function=bench_parse)
+
+    output_parser = subparsers.add_parser("output", help="Compares the output sinks on a program that shows many lines.")
+    output_parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Number of lines shown per run.")
+    output_parser.add_argument("--engine", choices=ENGINES.keys(), default="closure", help="Execution engine used to run the program.")
+    output_parser.set_defaults(function=bench_output)
+
+    input_parser = subparsers.add_parser("input", help="Compares the buffered input source to the built-in input.")
+    input_parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000], help="Number of lines read per run.")
+    input_parser.add_argument("--engine", choices=ENGINES.keys(), default="closure", help="Execution engine used to run the program.")
+    input_parser.set_defaults(function=bench_input)
+
+    cache_parser = subparsers.add_parser("cache", help="Compares parsing to loading a cached program.")
+    cache_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="Number of generated lines per run.")
+    cache_parser.set_defaults(function=bench_cache)
+
+    opt_parser = subparsers.add_parser("opt", help="Compares a loop of integer arithmetic before and after optimization.")
+    opt_parser.add_argument("--iterations", type=int, default=100000, help="Number of loop iterations.")
+    opt_parser.add_argument("--engines", choices=ENGINES.keys(), nargs="+", default=list(ENGINES.keys()), help="Execution engines to compare.")
+    opt_parser.set_defaults(function=bench_opt)
+
+    args = parser.parse_args()
+    args.function(args)
+
+if __name__ == "__main__":
+    main()
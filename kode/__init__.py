@@ -1,4 +1,15 @@
 from .tokens import tokenize
 from .span import spanize
-from .statements import statementize
-from .interpreter import parse, interpret, Interpreter
+from .lexer import lex, Lexer, StreamLexer
+from .statements import statementize, statementize_stream
+from .parser import parse_tokens, Parser
+from .interpreter import parse, interpret, interpret_stream, Interpreter, register_statement_interpreter, register_operator_interpreter
+from .optimizer import optimize, Optimizer, MAX_UNROLLED_TRIPS
+from .cache import parse_cached, encode_program, decode_program, ProgramCache
+from .output import OutputSink, BufferSink, StreamSink, NullSink, TeeSink
+from .input import InputSource, DequeSource, FileSource, ReplaySource, RecordingSource
+from .closures import ClosureInterpreter
+from .compiler import compile_bytecode, Bytecode, Opcode
+from .vm import VirtualMachine
+from .transpiler import transpile, PythonInterpreter
+from .engines import ENGINES
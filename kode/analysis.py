@@ -0,0 +1,154 @@
+from .statements import Assignment, Common, Conditional, Constant, IdentifierStatement, Invariant, LiteralStatement, Loop, Operation, Show, Statement, Statements
+from .frame import UNDEFINED
+from .errors import ParseError
+from typing import Set
+
+def constant_value(statement: Statement) -> any:
+    statement_type = type(statement)
+
+    if statement_type == Constant:
+        return statement.value
+    elif statement_type == LiteralStatement:
+        try:
+            return statement.literal.value
+        except ParseError:
+            return UNDEFINED
+
+    return UNDEFINED
+
+def assigned_names(statement: Statement) -> Set[str]:
+    statement_type = type(statement)
+
+    if statement_type == Assignment:
+        return {statement.identifier.value} | assigned_names(statement.statements)
+    elif statement_type == Statements:
+        return set().union(*[assigned_names(s) for s in statement])
+    elif statement_type == Show:
+        return assigned_names(statement.statements)
+    elif statement_type == Conditional:
+        names = assigned_names(statement.condition) | assigned_names(statement.pass_statement)
+
+        if statement.fail_statement:
+            names |= assigned_names(statement.fail_statement)
+
+        return names
+    elif statement_type == Loop:
+        return assigned_names(statement.condition) | assigned_names(statement.statement)
+    else:
+        return set()
+
+def read_names(statement: Statement) -> Set[str]:
+    statement_type = type(statement)
+
+    if statement_type == IdentifierStatement:
+        return {statement.identifier.value}
+    elif statement_type == Operation:
+        return read_names(statement.lhs) | read_names(statement.rhs)
+    elif statement_type == Invariant or statement_type == Common:
+        return read_names(statement.statement)
+    elif statement_type == Statements:
+        return set().union(*[read_names(s) for s in statement])
+    elif statement_type in [Assignment, Show]:
+        return read_names(statement.statements)
+    elif statement_type == Conditional:
+        names = read_names(statement.condition) | read_names(statement.pass_statement)
+
+        if statement.fail_statement:
+            names |= read_names(statement.fail_statement)
+
+        return names
+    elif statement_type == Loop:
+        return read_names(statement.condition) | read_names(statement.statement)
+    else:
+        return set()
+
+def statement_size(statement: Statement) -> int:
+    statement_type = type(statement)
+
+    if statement_type == Operation:
+        return 1 + statement_size(statement.lhs) + statement_size(statement.rhs)
+    elif statement_type == Invariant or statement_type == Common:
+        return 1 + statement_size(statement.statement)
+    elif statement_type == Statements:
+        return 1 + sum(statement_size(s) for s in statement)
+    elif statement_type in [Assignment, Show]:
+        return 1 + statement_size(statement.statements)
+    elif statement_type == Conditional:
+        size = 1 + statement_size(statement.condition) + statement_size(statement.pass_statement)
+
+        if statement.fail_statement:
+            size += statement_size(statement.fail_statement)
+
+        return size
+    elif statement_type == Loop:
+        return 1 + statement_size(statement.condition) + statement_size(statement.statement)
+    else:
+        return 1
+
+class ScopeAnalyzer:
+    __defined: Set[str]
+    __blocks: int
+    __elided: int
+
+    def __init__(self):
+        self.__defined = set()
+        self.__blocks = 0
+        self.__elided = 0
+
+    @property
+    def blocks(self) -> int:
+        return self.__blocks
+
+    @property
+    def elided(self) -> int:
+        return self.__elided
+
+    def analyze(self, ast: Statement):
+        # Top-level variables are never popped, so they stay visible to later statements.
+        self.visit(ast, self.__defined)
+
+    def visit(self, statement: Statement, defined: Set[str]) -> bool:
+        statement_type = type(statement)
+
+        if statement_type == Assignment:
+            defines = self.visit(statement.statements, defined)
+            name = statement.identifier.value
+
+            if not name in defined:
+                defined.add(name)
+                defines = True
+
+            return defines
+        elif statement_type == Statements:
+            defines = False
+
+            for s in statement:
+                defines = self.visit(s, defined) or defines
+
+            return defines
+        elif statement_type == Show:
+            return self.visit(statement.statements, defined)
+        elif statement_type == Conditional:
+            inner = set(defined)
+            defines = self.visit(statement.condition, inner)
+            defines = self.visit(statement.pass_statement, set(inner)) or defines
+
+            if statement.fail_statement:
+                defines = self.visit(statement.fail_statement, set(inner)) or defines
+
+            self.scope(statement, defines)
+        elif statement_type == Loop:
+            inner = set(defined)
+            defines = self.visit(statement.condition, inner)
+            defines = self.visit(statement.statement, inner) or defines
+
+            self.scope(statement, defines)
+
+        return False
+
+    def scope(self, statement: Statement, scoped: bool):
+        statement.scoped = scoped
+        self.__blocks += 1
+
+        if not scoped:
+            self.__elided += 1
@@ -0,0 +1,396 @@
+from .statements import Assignment, Conditional, IdentifierStatement, Input, LiteralStatement, Loop, Operation, Show, Statement, Statements
+from .tokens import Identifier, Literal, Operator, Token
+from .span import Span
+from array import array
+from collections import OrderedDict
+from enum import IntEnum, auto
+from functools import lru_cache
+from typing import Callable, Dict, List, Tuple
+import gc
+import hashlib
+import os
+import sys
+import threading
+
+MAGIC = b"KODEC"
+FORMAT_VERSION = 1
+
+# Parsed trees measured between 60 and 100 bytes per source character.
+AST_BYTES_PER_CHARACTER = 100
+
+class Node(IntEnum):
+    LITERAL = auto()
+    IDENTIFIER = auto()
+    INPUT = auto()
+    OPERATION = auto()
+    STATEMENTS = auto()
+    ASSIGNMENT = auto()
+    SHOW = auto()
+    CONDITIONAL = auto()
+    LOOP = auto()
+
+@lru_cache(maxsize=None)
+def interpreter_version() -> bytes:
+    # Any change to the interpreter sources invalidates every cached program.
+    digest = hashlib.sha256()
+    package = os.path.dirname(os.path.abspath(__file__))
+
+    for name in sorted(os.listdir(package)):
+        if not name.endswith(".py"): continue
+
+        with open(os.path.join(package, name), "rb") as h:
+            digest.update(name.encode())
+            digest.update(h.read())
+
+    return digest.digest()
+
+def program_key(source: str, file_path: str) -> bytes:
+    digest = hashlib.sha256()
+    digest.update(f"{FORMAT_VERSION}:{sys.byteorder}:{file_path}\0".encode())
+    digest.update(interpreter_version())
+    digest.update(source.encode())
+
+    return digest.digest()
+
+def cache_path(file_path: str, cache_dir: str = None) -> str:
+    if cache_dir == None:
+        return file_path + "c"
+
+    # Scripts sharing a name in different directories get their own entry.
+    name = hashlib.sha256(os.path.abspath(file_path).encode()).hexdigest()[:16]
+
+    return os.path.join(cache_dir, f"{os.path.basename(file_path)}.{name}.kodec")
+
+class ProgramEncoder:
+    __source: str
+    __code: array
+
+    def __init__(self, source: str):
+        self.__source = source
+        self.__code = array("i")
+
+    @property
+    def code(self) -> array:
+        return self.__code
+
+    def encode(self, statement: Statement):
+        encode_method = STATEMENT_ENCODERS.get(type(statement))
+
+        if encode_method == None:
+            raise ValueError(f"Cannot encode {type(statement).__name__}.")
+
+        encode_method(self, statement)
+
+    def emit(self, node: Node, *args: int):
+        self.__code.append(node)
+        self.__code.extend(args)
+
+    def span(self, span: Span) -> List[int]:
+        if not span.source is self.__source:
+            raise ValueError("Span is not part of the program source.")
+
+        return [span.start, span.end]
+
+    def token(self, token: Token) -> List[int]:
+        start, end = self.span(token.span)
+        value = token.span.value
+
+        # Comparison operators span their THAN but keep the operator word as value.
+        if not self.__source[start:start + len(value)] == value:
+            raise ValueError("Token value is not part of the program source.")
+
+        return [start, end, len(value)]
+
+    def encode_statements(self, statement: Statements):
+        count = 0
+
+        for s in statement:
+            self.encode(s)
+            count += 1
+
+        self.emit(Node.STATEMENTS, count)
+
+    def encode_literal(self, statement: LiteralStatement):
+        self.emit(Node.LITERAL, *self.span(statement.literal.span))
+
+    def encode_identifier(self, statement: IdentifierStatement):
+        self.emit(Node.IDENTIFIER, *self.span(statement.identifier.span))
+
+    def encode_input(self, statement: Input):
+        self.emit(Node.INPUT, *self.span(statement.span))
+
+    def encode_operation(self, statement: Operation):
+        self.encode(statement.lhs)
+        self.encode(statement.rhs)
+        self.emit(Node.OPERATION, *self.token(statement.operator))
+
+    def encode_assignment(self, statement: Assignment):
+        self.encode(statement.statements)
+        self.emit(Node.ASSIGNMENT, *self.span(statement.keyword_span), *self.span(statement.identifier.span))
+
+    def encode_show(self, statement: Show):
+        self.encode(statement.statements)
+        self.emit(Node.SHOW, *self.span(statement.keyword_span))
+
+    def encode_conditional(self, statement: Conditional):
+        self.encode(statement.condition)
+        self.encode(statement.pass_statement)
+
+        if statement.fail_statement:
+            self.encode(statement.fail_statement)
+
+        self.emit(Node.CONDITIONAL, *self.span(statement.keyword_span), 1 if statement.fail_statement else 0)
+
+    def encode_loop(self, statement: Loop):
+        self.encode(statement.condition)
+        self.encode(statement.statement)
+        self.emit(Node.LOOP, *self.span(statement.keyword_span))
+
+STATEMENT_ENCODERS: Dict[type, Callable[[ProgramEncoder, Statement], None]] = {
+    Statements: ProgramEncoder.encode_statements,
+    Conditional: ProgramEncoder.encode_conditional,
+    Loop: ProgramEncoder.encode_loop,
+    Assignment: ProgramEncoder.encode_assignment,
+    Operation: ProgramEncoder.encode_operation,
+    Show: ProgramEncoder.encode_show,
+    LiteralStatement: ProgramEncoder.encode_literal,
+    IdentifierStatement: ProgramEncoder.encode_identifier,
+    Input: ProgramEncoder.encode_input
+}
+
+def encode_program(ast: Statement, source: str) -> bytes:
+    encoder = ProgramEncoder(source)
+    encoder.encode(ast)
+
+    return encoder.code.tobytes()
+
+def decode_program(data: bytes, source: str, file_path: str) -> Statement:
+    code = array("i")
+    code.frombytes(data)
+
+    LITERAL, IDENTIFIER, INPUT, OPERATION, STATEMENTS, ASSIGNMENT, SHOW, CONDITIONAL, LOOP = Node
+
+    def span(start: int, end: int) -> Span:
+        return Span(value=None, file_path=file_path, start=start, end=end, source=source)
+
+    # Nodes are stored children first, so each one is built from the top of the stack.
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    pc = 0
+    size = len(code)
+
+    while pc < size:
+        node = code[pc]
+
+        if node == LITERAL:
+            push(LiteralStatement(Literal(span(code[pc + 1], code[pc + 2]))))
+            pc += 3
+        elif node == IDENTIFIER:
+            push(IdentifierStatement(Identifier(span(code[pc + 1], code[pc + 2]))))
+            pc += 3
+        elif node == OPERATION:
+            start, end, length = code[pc + 1], code[pc + 2], code[pc + 3]
+            operator_span = span(start, end)
+
+            if not length == end - start:
+                operator_span.value = source[start:start + length]
+
+            rhs = pop()
+            push(Operation(pop(), Operator(operator_span), rhs))
+            pc += 4
+        elif node == STATEMENTS:
+            count = code[pc + 1]
+            statements = stack[len(stack) - count:]
+            del stack[len(stack) - count:]
+            push(Statements(statements))
+            pc += 2
+        elif node == ASSIGNMENT:
+            push(Assignment(
+                span=span(code[pc + 1], code[pc + 2]),
+                identifier=Identifier(span(code[pc + 3], code[pc + 4])),
+                statements=pop()
+            ))
+            pc += 5
+        elif node == SHOW:
+            push(Show(span(code[pc + 1], code[pc + 2]), pop()))
+            pc += 3
+        elif node == INPUT:
+            push(Input(span(code[pc + 1], code[pc + 2])))
+            pc += 3
+        elif node == CONDITIONAL:
+            fail_statement = pop() if code[pc + 3] else None
+            pass_statement = pop()
+            push(Conditional(
+                span=span(code[pc + 1], code[pc + 2]),
+                condition=pop(),
+                pass_statement=pass_statement,
+                fail_statement=fail_statement
+            ))
+            pc += 4
+        elif node == LOOP:
+            statement = pop()
+            push(Loop(
+                span=span(code[pc + 1], code[pc + 2]),
+                condition=pop(),
+                statement=statement
+            ))
+            pc += 3
+        else:
+            raise ValueError(f"Unknown node {node}.")
+
+    if not len(stack) == 1: raise ValueError("Malformed program.")
+
+    return stack[0]
+
+def load_program(path: str, key: bytes, source: str, file_path: str) -> Statement:
+    try:
+        with open(path, "rb") as h:
+            data = h.read()
+    except OSError:
+        return None
+
+    header = MAGIC + key
+
+    if not data[:len(header)] == header: return None
+
+    # The decoded tree holds no cycles, collecting while it grows only costs time.
+    collecting = gc.isenabled()
+    gc.disable()
+
+    try:
+        return decode_program(data[len(header):], source, file_path)
+    except (ValueError, IndexError):
+        return None
+    finally:
+        if collecting: gc.enable()
+
+def store_program(path: str, key: bytes, ast: Statement, source: str) -> bool:
+    try:
+        data = encode_program(ast, source)
+    except (ValueError, RecursionError):
+        return False
+
+    temp_path = f"{path}.{os.getpid()}.tmp"
+
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        with open(temp_path, "wb") as h:
+            h.write(MAGIC + key + data)
+
+        # Concurrent runs either see the previous entry or the complete new one.
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path): os.remove(temp_path)
+
+        return False
+
+    return True
+
+def parse_cached(source: str, file_path: str, cache_dir: str = None) -> Statement:
+    from .interpreter import parse
+
+    path = cache_path(file_path, cache_dir)
+    key = program_key(source, file_path)
+    ast = load_program(path, key, source, file_path)
+
+    if not ast == None: return ast
+
+    ast = parse(source, file_path)
+
+    if ast == None: return None
+
+    store_program(path, key, ast, source)
+
+    return ast
+
+class ProgramCache:
+    __programs: Dict[bytes, Tuple[Statement, int]]
+    __max_programs: int
+    __max_size: int
+    __size: int
+    __hits: int
+    __misses: int
+    __evictions: int
+    __optimize: bool
+    __lock: threading.Lock
+
+    def __init__(self, max_programs: int = 256, max_size: int = 64 << 20, optimize: bool = False):
+        self.__programs = OrderedDict()
+        self.__max_programs = max_programs
+        self.__max_size = max_size
+        self.__size = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__optimize = optimize
+        self.__lock = threading.Lock()
+
+    @property
+    def statistics(self) -> Dict[str, any]:
+        return {
+            "Programs": len(self.__programs),
+            "Size": self.__size,
+            "Hits": self.__hits,
+            "Misses": self.__misses,
+            "Evictions": self.__evictions
+        }
+
+    def get(self, source: str, file_path: str) -> Statement:
+        from .lexer import lex
+        from .parser import parse_tokens
+        from .optimizer import optimize
+
+        key = hashlib.sha256(f"{file_path}\0{source}".encode()).digest()
+
+        with self.__lock:
+            entry = self.__programs.get(key)
+
+            if not entry == None:
+                self.__programs.move_to_end(key)
+                self.__hits += 1
+
+                return entry[0]
+
+            self.__misses += 1
+
+        # Parse errors propagate and leave nothing behind in the cache.
+        ast = parse_tokens(lex(source, file_path))
+
+        if self.__optimize: ast = optimize(ast)
+
+        size = len(source) * AST_BYTES_PER_CHARACTER
+
+        with self.__lock:
+            if size > self.__max_size or key in self.__programs: return ast
+
+            self.__programs[key] = (ast, size)
+            self.__size += size
+
+            while len(self.__programs) > self.__max_programs or self.__size > self.__max_size:
+                _, (_, evicted_size) = self.__programs.popitem(last=False)
+                self.__size -= evicted_size
+                self.__evictions += 1
+
+        return ast
+
+    def warm(self, directory: str, file_path: str) -> int:
+        from .errors import ParseError
+
+        count = 0
+
+        for sub_dir, dirs, files in os.walk(directory):
+            for file in sorted(files):
+                if not file.endswith(".kode"): continue
+
+                with open(os.path.join(sub_dir, file)) as h:
+                    source = h.read()
+
+                try:
+                    self.get(source, file_path)
+                    count += 1
+                except ParseError:
+                    pass
+
+        return count
@@ -0,0 +1,394 @@
+from kode.utils import print_span
+from .statements import Common, Conditional, Constant, IdentifierStatement, Input, Invariant, LiteralStatement, Loop, Statement, Statements, Assignment, Operation, Show
+from .runtime import SHORT_CIRCUITS, OperandError, checked_operator_function, operator_function, literal_type, parse_input, result_span
+from .interpreter import Interpreter
+from .output import OutputSink
+from .frame import UNDEFINED
+from .errors import ParseError, InterpreterError
+from typing import Callable, Dict
+
+Closure = Callable[[], any]
+
+class ClosureCompiler:
+    __interpreter: Interpreter
+    __debug: bool
+
+    def __init__(self, interpreter: Interpreter, debug: bool = False):
+        self.__interpreter = interpreter
+        self.__debug = debug
+
+    def compile(self, statement: Statement) -> Closure:
+        compile_method = CLOSURE_COMPILERS.get(type(statement))
+
+        if compile_method == None:
+            raise InterpreterError(statement.span, "Cannot interpret statement.")
+
+        closure = compile_method(self, statement)
+
+        if self.__debug:
+            closure = self.__debugged(closure, statement)
+
+        return closure
+
+    def __debugged(self, closure: Closure, statement: Statement) -> Closure:
+        def debug():
+            value = closure()
+
+            print_span(result_span(statement))
+            print("|", "Value:", value)
+            print("|")
+
+            return value
+
+        return debug
+
+    def __scoped(self, closure: Closure, statement: Statement) -> Closure:
+        if not statement.scoped:
+            return closure
+
+        scope = self.__interpreter.scope
+
+        def scoped():
+            scope.push()
+
+            value = closure()
+
+            scope.pop()
+
+            return value
+
+        return scoped
+
+    def compile_statements(self, statement: Statements) -> Closure:
+        closures = [self.compile(s) for s in statement]
+
+        if len(closures) == 0:
+            return lambda: ""
+
+        if len(closures) == 1:
+            return closures[0]
+
+        def run_statements():
+            for closure in closures:
+                value = closure()
+
+            return value
+
+        return run_statements
+
+    def compile_literal(self, statement: LiteralStatement) -> Closure:
+        try:
+            value = statement.literal.value
+        except ParseError as err:
+            # Invalid literals only fail once they are evaluated.
+            def raise_error():
+                raise err
+
+            return raise_error
+
+        return lambda: value
+
+    def compile_constant(self, statement: Constant) -> Closure:
+        value = statement.value
+
+        return lambda: value
+
+    def compile_invariant(self, statement: Invariant) -> Closure:
+        values = self.__interpreter.scope.values
+        slot = self.__interpreter.scope.temporary(statement.index)
+        inner = self.compile(statement.statement)
+
+        def invariant():
+            value = values[slot]
+
+            if value is UNDEFINED:
+                value = inner()
+                values[slot] = value
+
+            return value
+
+        return invariant
+
+    def compile_common(self, statement: Common) -> Closure:
+        values = self.__interpreter.scope.values
+        slot = self.__interpreter.scope.temporary(statement.index)
+
+        if not statement.first:
+            def load_common():
+                return values[slot]
+
+            return load_common
+
+        inner = self.compile(statement.statement)
+
+        def store_common():
+            value = values[slot] = inner()
+
+            return value
+
+        return store_common
+
+    def compile_identifier(self, statement: IdentifierStatement) -> Closure:
+        frame = self.__interpreter.scope
+        values = frame.values
+        load = frame.load
+        identifier = statement.identifier
+        slot = frame.slot(identifier)
+
+        def identify():
+            value = values[slot]
+
+            if value is UNDEFINED: return load(slot, identifier)
+
+            return value
+
+        return identify
+
+    def compile_assignment(self, statement: Assignment) -> Closure:
+        if not statement.update == None:
+            return self.compile_update(statement)
+
+        frame = self.__interpreter.scope
+        store = frame.store
+        slot = frame.slot(statement.identifier)
+        inner = self.compile(statement.statements)
+
+        def assign():
+            value = inner()
+
+            store(slot, value)
+
+            return value
+
+        return assign
+
+    def compile_update(self, statement: Assignment) -> Closure:
+        update = statement.update
+        frame = self.__interpreter.scope
+        values = frame.values
+        load = frame.load
+        identifier = update.identifier
+        slot = frame.slot(identifier)
+        function = checked_operator_function(update.operation)
+        fused = self.__interpreter.fused
+        kind = update.kind
+        constant = update.constant
+
+        if not constant is UNDEFINED:
+            def update_constant():
+                value = values[slot]
+
+                if value is UNDEFINED: load(slot, identifier)
+
+                value = values[slot] = function(value, constant)
+                fused[kind] += 1
+
+                return value
+
+            return update_constant
+
+        operand = self.compile(update.operand)
+
+        def update_operand():
+            value = values[slot]
+
+            if value is UNDEFINED: load(slot, identifier)
+
+            value = values[slot] = function(value, operand())
+            fused[kind] += 1
+
+            return value
+
+        return update_operand
+
+    def compile_operation(self, statement: Operation) -> Closure:
+        lhs = self.compile(statement.lhs)
+        rhs = self.compile(statement.rhs)
+
+        if statement.operator_type in SHORT_CIRCUITS:
+            return self.compile_short_circuit(statement, lhs, rhs)
+
+        operator = operator_function(statement)
+
+        if not statement.operand_types == None:
+            return lambda: operator(lhs(), rhs())
+
+        def operate():
+            try:
+                return operator(lhs(), rhs())
+            except OperandError as err:
+                operand = statement.rhs if err.operand else statement.lhs
+
+                raise InterpreterError(result_span(operand), str(err))
+
+        return operate
+
+    def compile_short_circuit(self, statement: Operation, lhs: Closure, rhs: Closure) -> Closure:
+        skipped = self.__interpreter.skipped
+        operator = statement.operator_type
+        decided = SHORT_CIRCUITS[operator]
+
+        def short_circuit():
+            value = lhs()
+
+            if bool(value) == decided:
+                skipped[operator] += 1
+
+                return value
+
+            return rhs()
+
+        return short_circuit
+
+    def compile_show(self, statement: Show) -> Closure:
+        display = self.__interpreter.display
+        inner = self.compile(statement.statements)
+
+        def show():
+            value = inner()
+
+            display(value)
+
+            return value
+
+        return show
+
+    def compile_input(self, statement: Input) -> Closure:
+        read = self.__interpreter.read
+        span = statement.span
+
+        return lambda: parse_input(read(), span)
+
+    def compile_conditional(self, statement: Conditional) -> Closure:
+        condition = self.compile(statement.condition)
+        pass_closure = self.compile(statement.pass_statement)
+
+        if statement.fail_statement:
+            fail_closure = self.compile(statement.fail_statement)
+        else:
+            fail_closure = lambda: None
+
+        if statement.negated:
+            pass_closure, fail_closure = fail_closure, pass_closure
+
+        def conditional():
+            value = condition()
+
+            if not type(value) == bool:
+                raise InterpreterError(result_span(statement.condition), f"Cannot perform conditional with {literal_type(value)}.")
+
+            if value:
+                return pass_closure()
+            else:
+                return fail_closure()
+
+        return self.__scoped(conditional, statement)
+
+    def compile_loop(self, statement: Loop) -> Closure:
+        if not statement.induction == None:
+            return self.__scoped(self.compile_counted_loop(statement), statement)
+
+        condition = self.compile(statement.condition)
+        body = self.compile(statement.statement)
+        values = self.__interpreter.scope.values
+        temporaries = [self.__interpreter.scope.temporary(index) for index in statement.invariants]
+
+        def loop():
+            for slot in temporaries:
+                values[slot] = UNDEFINED
+
+            last_value = None
+
+            while True:
+                value = condition()
+
+                if not type(value) == bool:
+                    raise InterpreterError(result_span(statement.condition), f"Cannot perform loop conditional with {literal_type(value)}.")
+
+                if not value: break
+
+                last_value = body()
+
+            return last_value
+
+        return self.__scoped(loop, statement)
+
+    def compile_counted_loop(self, statement: Loop) -> Closure:
+        induction = statement.induction
+        frame = self.__interpreter.scope
+        values = frame.values
+        load = frame.load
+        counter = induction.counter
+        slot = frame.slot(counter)
+        bound = self.compile(induction.bound)
+        body = self.compile(induction.body)
+        compare = checked_operator_function(induction.condition)
+        advance = checked_operator_function(induction.increment)
+        step = induction.step
+        counter_first = induction.counter_first
+        temporaries = [frame.temporary(index) for index in statement.invariants]
+
+        if not counter_first:
+            compare = lambda value, limit, compare=compare: compare(limit, value)
+
+        def counted_loop():
+            for temporary in temporaries:
+                values[temporary] = UNDEFINED
+
+            if counter_first:
+                value = load(slot, counter)
+                limit = bound()
+            else:
+                limit = bound()
+                value = load(slot, counter)
+
+            last_value = None
+
+            while compare(value, limit):
+                body()
+                value = advance(value, step)
+                values[slot] = value
+                last_value = value
+
+            return last_value
+
+        return counted_loop
+
+CLOSURE_COMPILERS: Dict[type, Callable[[ClosureCompiler, Statement], Closure]] = {
+    Statements: ClosureCompiler.compile_statements,
+    Conditional: ClosureCompiler.compile_conditional,
+    Loop: ClosureCompiler.compile_loop,
+    Assignment: ClosureCompiler.compile_assignment,
+    Operation: ClosureCompiler.compile_operation,
+    Show: ClosureCompiler.compile_show,
+    LiteralStatement: ClosureCompiler.compile_literal,
+    Constant: ClosureCompiler.compile_constant,
+    Invariant: ClosureCompiler.compile_invariant,
+    Common: ClosureCompiler.compile_common,
+    IdentifierStatement: ClosureCompiler.compile_identifier,
+    Input: ClosureCompiler.compile_input
+}
+
+class ClosureInterpreter(Interpreter):
+    __closure: Closure
+    __compiler: ClosureCompiler
+
+    def __init__(self, ast: Statements, silent: bool = False, debug: bool = False, input_method: Callable[[], str] = input, output: OutputSink = None):
+        super().__init__(ast, silent=silent, debug=debug, input_method=input_method, output=output)
+        self.__closure = None
+        self.__compiler = ClosureCompiler(self, debug=debug)
+
+    def compile(self, ast: Statement) -> Closure:
+        # Only the program's own AST is cached, other statements are compiled on demand.
+        if not ast is self.ast:
+            return self.__compiler.compile(ast)
+
+        if self.__closure == None:
+            self.__closure = self.__compiler.compile(ast)
+
+        return self.__closure
+
+    def run(self, ast: Statement = None) -> any:
+        if ast == None: ast = self.ast
+
+        return self.compile(ast)()
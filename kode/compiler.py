@@ -0,0 +1,263 @@
+from .statements import Common, Conditional, Constant, IdentifierStatement, Input, Invariant, LiteralStatement, Loop, Statement, Statements, Assignment, Operation, Show
+from .runtime import SHORT_CIRCUITS, result_span
+from .frame import UNDEFINED
+from .span import Span
+from .errors import ParseError, InterpreterError
+from enum import IntEnum, auto
+from typing import Callable, Dict, List
+
+class Opcode(IntEnum):
+    LOAD_CONST = auto()
+    LOAD_VAR = auto()
+    STORE_VAR = auto()
+    BINARY_OP = auto()
+    JUMP_IF_FALSE = auto()
+    JUMP_IF_TRUE = auto()
+    JUMP = auto()
+    SHOW = auto()
+    INPUT = auto()
+    POP = auto()
+    PUSH_SCOPE = auto()
+    POP_SCOPE = auto()
+    RAISE = auto()
+    LOAD_INVARIANT = auto()
+    STORE_TEMPORARY = auto()
+    LOAD_TEMPORARY = auto()
+    RESET_INVARIANTS = auto()
+    ENTER_COUNTED = auto()
+    TEST_COUNTED = auto()
+    STEP_COUNTED = auto()
+    EXIT_COUNTED = auto()
+    UPDATE_CONST = auto()
+    UPDATE = auto()
+    JUMP_IF_DECIDED = auto()
+
+class Bytecode:
+    __opcodes: List[Opcode]
+    __args: List[any]
+    __origins: List[Statement]
+
+    def __init__(self):
+        self.__opcodes = []
+        self.__args = []
+        self.__origins = []
+
+    @property
+    def opcodes(self) -> List[Opcode]:
+        return self.__opcodes
+
+    @property
+    def args(self) -> List[any]:
+        return self.__args
+
+    @property
+    def origins(self) -> List[Statement]:
+        return self.__origins
+
+    def emit(self, opcode: Opcode, arg: any, origin: Statement) -> int:
+        self.__opcodes.append(opcode)
+        self.__args.append(arg)
+        self.__origins.append(origin)
+
+        return len(self.__opcodes) - 1
+
+    def patch(self, index: int, arg: any):
+        self.__args[index] = arg
+
+    def span(self, index: int) -> Span:
+        return result_span(self.__origins[index])
+
+    def disassemble(self) -> str:
+        lines = []
+
+        for i, (opcode, arg) in enumerate(zip(self.__opcodes, self.__args)):
+            if opcode == Opcode.LOAD_CONST:
+                arg = repr(arg)
+            elif arg == None:
+                arg = ""
+
+            lines.append(f"{i:>6} {opcode.name:<14} {arg}")
+
+        return "\n".join(lines)
+
+    def __len__(self) -> int:
+        return len(self.__opcodes)
+
+    def __str__(self) -> str:
+        return f"Bytecode({len(self)})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+class Compiler:
+    __bytecode: Bytecode
+
+    def __init__(self):
+        self.__bytecode = Bytecode()
+
+    @property
+    def bytecode(self) -> Bytecode:
+        return self.__bytecode
+
+    def compile(self, statement: Statement):
+        compile_method = STATEMENT_COMPILERS.get(type(statement))
+
+        if compile_method == None:
+            raise InterpreterError(statement.span, "Cannot interpret statement.")
+
+        compile_method(self, statement)
+
+    def emit(self, opcode: Opcode, arg: any, origin: Statement) -> int:
+        return self.__bytecode.emit(opcode, arg, origin)
+
+    def label(self) -> int:
+        return len(self.__bytecode)
+
+    def patch(self, index: int, target: int):
+        self.__bytecode.patch(index, target)
+
+    def compile_statements(self, statement: Statements):
+        statements = list(statement)
+
+        if len(statements) == 0:
+            self.emit(Opcode.LOAD_CONST, "", statement)
+            return
+
+        for i, s in enumerate(statements):
+            if i > 0: self.emit(Opcode.POP, None, s)
+            self.compile(s)
+
+    def compile_literal(self, statement: LiteralStatement):
+        try:
+            self.emit(Opcode.LOAD_CONST, statement.literal.value, statement)
+        except ParseError as err:
+            self.emit(Opcode.RAISE, err, statement)
+
+    def compile_constant(self, statement: Constant):
+        self.emit(Opcode.LOAD_CONST, statement.value, statement)
+
+    def compile_invariant(self, statement: Invariant):
+        # Jumps past the expression once its temporary holds a value.
+        load = self.emit(Opcode.LOAD_INVARIANT, None, statement)
+        self.compile(statement.statement)
+        self.emit(Opcode.STORE_TEMPORARY, statement.index, statement)
+        self.patch(load, (statement.index, self.label()))
+
+    def compile_common(self, statement: Common):
+        if statement.first:
+            self.compile(statement.statement)
+            self.emit(Opcode.STORE_TEMPORARY, statement.index, statement)
+        else:
+            self.emit(Opcode.LOAD_TEMPORARY, statement.index, statement)
+
+    def compile_identifier(self, statement: IdentifierStatement):
+        self.emit(Opcode.LOAD_VAR, statement.identifier, statement)
+
+    def compile_assignment(self, statement: Assignment):
+        update = statement.update
+
+        if update == None:
+            self.compile(statement.statements)
+            self.emit(Opcode.STORE_VAR, statement.identifier, statement)
+        elif not update.constant is UNDEFINED:
+            self.emit(Opcode.UPDATE_CONST, update, statement)
+        else:
+            # Replaces the operation and the store, the variable is still loaded before the operand.
+            self.compile(update.operation.lhs)
+            self.compile(update.operand)
+            self.emit(Opcode.UPDATE, update, statement)
+
+    def compile_operation(self, statement: Operation):
+        self.compile(statement.lhs)
+
+        if statement.operator_type in SHORT_CIRCUITS:
+            # The left operand stays as the result when it decides it, otherwise it is replaced by the right one.
+            jump = self.emit(Opcode.JUMP_IF_DECIDED, None, statement)
+            self.compile(statement.rhs)
+            self.patch(jump, (statement.operator_type, self.label()))
+            return
+
+        self.compile(statement.rhs)
+        if statement.operand_types == None:
+            self.emit(Opcode.BINARY_OP, statement.operator_type, statement)
+        else:
+            self.emit(Opcode.BINARY_OP, (statement.operator_type, *statement.operand_types), statement)
+
+    def compile_show(self, statement: Show):
+        self.compile(statement.statements)
+        self.emit(Opcode.SHOW, None, statement)
+
+    def compile_input(self, statement: Input):
+        self.emit(Opcode.INPUT, statement.span, statement)
+
+    def compile_conditional(self, statement: Conditional):
+        if statement.scoped: self.emit(Opcode.PUSH_SCOPE, None, statement)
+        self.compile(statement.condition)
+        jump_fail = self.emit(Opcode.JUMP_IF_TRUE if statement.negated else Opcode.JUMP_IF_FALSE, None, statement)
+        self.compile(statement.pass_statement)
+        jump_end = self.emit(Opcode.JUMP, None, statement)
+        self.patch(jump_fail, self.label())
+
+        if statement.fail_statement:
+            self.compile(statement.fail_statement)
+        else:
+            self.emit(Opcode.LOAD_CONST, None, statement)
+
+        self.patch(jump_end, self.label())
+        if statement.scoped: self.emit(Opcode.POP_SCOPE, None, statement)
+
+    def compile_loop(self, statement: Loop):
+        if statement.invariants: self.emit(Opcode.RESET_INVARIANTS, statement.invariants, statement)
+        if statement.scoped: self.emit(Opcode.PUSH_SCOPE, None, statement)
+
+        if statement.induction == None:
+            self.compile_condition_loop(statement)
+        else:
+            self.compile_counted_loop(statement)
+
+        if statement.scoped: self.emit(Opcode.POP_SCOPE, None, statement)
+
+    def compile_condition_loop(self, statement: Loop):
+        self.emit(Opcode.LOAD_CONST, None, statement)
+        loop_start = self.label()
+        self.compile(statement.condition)
+        jump_exit = self.emit(Opcode.JUMP_IF_FALSE, None, statement)
+        self.emit(Opcode.POP, None, statement)
+        self.compile(statement.statement)
+        self.emit(Opcode.JUMP, loop_start, statement)
+        self.patch(jump_exit, self.label())
+
+    def compile_counted_loop(self, statement: Loop):
+        induction = statement.induction
+
+        # The counter and the bound are read once, in the order of the condition, and only the bound stays on the stack.
+        self.compile(induction.condition.lhs)
+        self.compile(induction.condition.rhs)
+        self.emit(Opcode.ENTER_COUNTED, induction.counter_first, statement)
+        loop_start = self.label()
+        test = self.emit(Opcode.TEST_COUNTED, None, statement)
+        self.compile(induction.body)
+        self.emit(Opcode.STEP_COUNTED, (induction.counter, induction.increment, induction.step, loop_start), statement)
+        self.patch(test, (induction.counter, induction.condition, induction.counter_first, self.label()))
+        self.emit(Opcode.EXIT_COUNTED, None, statement)
+
+STATEMENT_COMPILERS: Dict[type, Callable[[Compiler, Statement], None]] = {
+    Statements: Compiler.compile_statements,
+    Conditional: Compiler.compile_conditional,
+    Loop: Compiler.compile_loop,
+    Assignment: Compiler.compile_assignment,
+    Operation: Compiler.compile_operation,
+    Show: Compiler.compile_show,
+    LiteralStatement: Compiler.compile_literal,
+    Constant: Compiler.compile_constant,
+    Invariant: Compiler.compile_invariant,
+    Common: Compiler.compile_common,
+    IdentifierStatement: Compiler.compile_identifier,
+    Input: Compiler.compile_input
+}
+
+def compile_bytecode(ast: Statement) -> Bytecode:
+    compiler = Compiler()
+    compiler.compile(ast)
+
+    return compiler.bytecode
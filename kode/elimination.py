@@ -0,0 +1,184 @@
+from .statements import Assignment, Conditional, IdentifierStatement, Loop, Show, Statement, Statements
+from .analysis import assigned_names, constant_value, read_names
+from .frame import UNDEFINED
+from .rewriting import TreeRewriter, rebuild_assignment, rebuild_conditional, rebuild_loop, rebuild_show, rebuild_statements
+from typing import FrozenSet, List, Set
+
+def is_empty(statement: Statement) -> bool:
+    return type(statement) == Statements and len(list(statement)) == 0
+
+def is_removable(statement: Statement, defined: FrozenSet[str]) -> bool:
+    # Evaluating these can neither fail nor have an effect, so an unused value needs no statement.
+    if type(statement) == IdentifierStatement:
+        return statement.identifier.value in defined
+
+    return not constant_value(statement) is UNDEFINED
+
+class DeadCodeEliminator(TreeRewriter):
+    __whole_program: bool
+    __unread: Set[str]
+    __used: bool
+    __defined: FrozenSet[str]
+    __stores: int
+    __branches: int
+    __inverted: int
+
+    def __init__(self, whole_program: bool = True):
+        self.__whole_program = whole_program
+        self.__unread = set()
+        self.__used = False
+        self.__defined = frozenset()
+        self.__stores = 0
+        self.__branches = 0
+        self.__inverted = 0
+
+    @property
+    def stores(self) -> int:
+        return self.__stores
+
+    @property
+    def branches(self) -> int:
+        return self.__branches
+
+    @property
+    def inverted(self) -> int:
+        return self.__inverted
+
+    def eliminate(self, ast: Statement) -> Statement:
+        # Later statements of a stream are not read yet, so they may still read any variable.
+        if self.__whole_program:
+            self.__unread = assigned_names(ast) - read_names(ast)
+
+        return self.visit_in(ast, False, frozenset())
+
+    def visit_in(self, statement: Statement, used: bool, defined: FrozenSet[str]) -> Statement:
+        # Whether the value is used and which names are surely defined hold for one node, its visitor reads them back.
+        outer = (self.__used, self.__defined)
+        self.__used, self.__defined = used, defined
+        statement = self.visit(statement)
+        self.__used, self.__defined = outer
+
+        return statement
+
+    def remove_store(self, statement: Assignment, defined: FrozenSet[str]) -> Statement:
+        self.__stores += 1
+
+        value = self.visit_in(statement.statements, False, defined)
+
+        if is_removable(value, defined): return Statements([])
+
+        return value
+
+    def overwritten(self, statements: List[Statement]) -> Set[int]:
+        overwritten = set()
+        stores = {}
+
+        # Walking backwards, a name maps to True when a store at this level comes before any read of it.
+        for i in range(len(statements) - 1, -1, -1):
+            statement = statements[i]
+
+            if type(statement) == Assignment:
+                name = statement.identifier.value
+                reads = read_names(statement.statements)
+
+                if stores.get(name): overwritten.add(i)
+
+                for read in reads:
+                    stores[read] = False
+
+                stores[name] = not name in reads
+            else:
+                for read in read_names(statement):
+                    stores[read] = False
+
+        return overwritten
+
+    def visit_statements(self, statement: Statements) -> Statement:
+        used = self.__used
+        defined = set(self.__defined)
+        old_statements = list(statement)
+        overwritten = self.overwritten(old_statements)
+        statements = []
+
+        for i, old in enumerate(old_statements):
+            last = used and i == len(old_statements) - 1
+
+            if i in overwritten:
+                new = self.remove_store(old, frozenset(defined))
+            else:
+                new = self.visit_in(old, last, frozenset(defined))
+
+            if type(new) == Statements and not new is old:
+                statements.extend(new)
+            else:
+                statements.append(new)
+
+            # Stores at this level stay defined until the enclosing block ends.
+            if type(new) == Assignment:
+                defined.add(new.identifier.value)
+
+        return rebuild_statements(statement, statements)
+
+    def visit_assignment(self, statement: Assignment) -> Statement:
+        used = self.__used
+        defined = self.__defined
+
+        if not used and statement.identifier.value in self.__unread:
+            return self.remove_store(statement, defined)
+
+        return rebuild_assignment(statement, self.visit_in(statement.statements, True, defined))
+
+    def visit_show(self, statement: Show) -> Statement:
+        return rebuild_show(statement, self.visit_in(statement.statements, True, self.__defined))
+
+    def visit_conditional(self, statement: Conditional) -> Statement:
+        used = self.__used
+        defined = self.__defined
+        condition = self.visit_in(statement.condition, True, defined)
+        pass_statement = self.visit_in(statement.pass_statement, used, defined)
+        fail_statement = self.visit_in(statement.fail_statement, used, defined) if statement.fail_statement else None
+        negated = statement.negated
+        value = constant_value(condition)
+
+        # An empty branch has a different value than a missing one, so only unused conditionals are reshaped.
+        if not used and type(value) == bool:
+            branch = pass_statement if value != negated else fail_statement
+
+            if branch == None:
+                self.__branches += 1
+
+                return Statements([])
+
+            # Names first defined in the branch are popped with its block, so those blocks stay.
+            if assigned_names(branch) <= defined:
+                self.__branches += 1
+
+                return branch
+
+        if not used and fail_statement and is_empty(fail_statement):
+            self.__branches += 1
+            fail_statement = None
+
+        if not used and fail_statement and is_empty(pass_statement):
+            self.__inverted += 1
+            pass_statement, fail_statement = fail_statement, None
+            negated = not negated
+
+        conditional = rebuild_conditional(statement, condition, pass_statement, fail_statement)
+        conditional.negated = negated
+
+        return conditional
+
+    def visit_loop(self, statement: Loop) -> Statement:
+        used = self.__used
+        defined = self.__defined
+        condition = self.visit_in(statement.condition, True, defined)
+
+        if not used and constant_value(condition) is False:
+            self.__branches += 1
+
+            return Statements([])
+
+        body = self.visit_in(statement.statement, used, defined)
+
+        return rebuild_loop(statement, condition, body)
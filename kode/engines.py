@@ -0,0 +1,11 @@
+from .interpreter import Interpreter
+from .closures import ClosureInterpreter
+from .vm import VirtualMachine
+from .transpiler import PythonInterpreter
+
+ENGINES = {
+    "tree": Interpreter,
+    "closure": ClosureInterpreter,
+    "vm": VirtualMachine,
+    "python": PythonInterpreter
+}
@@ -0,0 +1,118 @@
+from .statements import Assignment, Common, Conditional, IdentifierStatement, Invariant, Loop, Operation, Show, Statement, Statements
+from .tokens import Identifier
+from .errors import InterpreterError
+from typing import Dict, List
+
+class Undefined:
+    def __repr__(self) -> str:
+        return "UNDEFINED"
+
+UNDEFINED = Undefined()
+
+class Frame:
+    __indexes: Dict[str, int]
+    __temporaries: Dict[int, int]
+    __values: List[any]
+    __trail: List[int]
+    __marks: List[int]
+
+    def __init__(self):
+        self.__indexes = {}
+        self.__temporaries = {}
+        self.__values = []
+        self.__trail = []
+        self.__marks = []
+
+    @property
+    def values(self) -> List[any]:
+        return self.__values
+
+    def slot(self, identifier: Identifier) -> int:
+        index = self.__indexes.get(identifier.value)
+
+        if index == None:
+            index = len(self.__values)
+            self.__indexes[identifier.value] = index
+            self.__values.append(UNDEFINED)
+
+        return index
+
+    def temporary(self, index: int) -> int:
+        # Temporaries have no name and are never trailed, so scopes do not pop them.
+        slot = self.__temporaries.get(index)
+
+        if slot == None:
+            slot = len(self.__values)
+            self.__temporaries[index] = slot
+            self.__values.append(UNDEFINED)
+
+        return slot
+
+    def resolve(self, statement: Statement):
+        statement_type = type(statement)
+
+        if statement_type == IdentifierStatement:
+            self.slot(statement.identifier)
+        elif statement_type == Assignment:
+            self.slot(statement.identifier)
+            self.resolve(statement.statements)
+        elif statement_type == Operation:
+            self.resolve(statement.lhs)
+            self.resolve(statement.rhs)
+        elif statement_type == Statements:
+            for s in statement: self.resolve(s)
+        elif statement_type == Show:
+            self.resolve(statement.statements)
+        elif statement_type == Conditional:
+            self.resolve(statement.condition)
+            self.resolve(statement.pass_statement)
+
+            if statement.fail_statement:
+                self.resolve(statement.fail_statement)
+        elif statement_type == Loop:
+            self.resolve(statement.condition)
+            self.resolve(statement.statement)
+        elif statement_type == Invariant or statement_type == Common:
+            self.resolve(statement.statement)
+
+    def push(self):
+        self.__marks.append(len(self.__trail))
+
+    def pop(self):
+        if len(self.__marks) == 0: return
+
+        mark = self.__marks.pop()
+        values = self.__values
+
+        # Variables first defined inside the block go out of scope with it.
+        for index in self.__trail[mark:]:
+            values[index] = UNDEFINED
+
+        del self.__trail[mark:]
+
+    def load(self, index: int, identifier: Identifier) -> any:
+        value = self.__values[index]
+
+        if value is UNDEFINED: raise InterpreterError(identifier.span, f"Variable {identifier.value} not defined.")
+
+        return value
+
+    def store(self, index: int, value: any):
+        if self.__values[index] is UNDEFINED:
+            self.__trail.append(index)
+
+        self.__values[index] = value
+
+    def put(self, key: Identifier, value: any):
+        self.store(self.slot(key), value)
+
+    def get(self, key: Identifier) -> any:
+        return self.load(self.slot(key), key)
+
+    def __repr__(self) -> str:
+        return str(self)
+
+    def __str__(self) -> str:
+        values = {name: self.__values[index] for name, index in self.__indexes.items() if not self.__values[index] is UNDEFINED}
+
+        return f"Frame({values},{len(self.__marks)})"
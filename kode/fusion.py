@@ -0,0 +1,116 @@
+from .statements import Assignment, IdentifierStatement, Operation, Statement
+from .tokens import Identifier, OperatorType
+from .analysis import constant_value
+from .frame import UNDEFINED
+from .rewriting import TreeRewriter, rebuild_assignment
+from enum import IntEnum, auto
+from typing import Dict
+
+class UpdateKind(IntEnum):
+    INCREMENT = auto()
+    CONSTANT = auto()
+    VARIABLE = auto()
+    OPERATION = auto()
+
+UPDATE_NAMES: Dict[UpdateKind, str] = {
+    UpdateKind.INCREMENT: "Fused increments",
+    UpdateKind.CONSTANT: "Fused constant updates",
+    UpdateKind.VARIABLE: "Fused variable updates",
+    UpdateKind.OPERATION: "Fused operation updates"
+}
+
+# AND and OR may skip their right operand, so they are never fused.
+UNFUSED_OPERATORS = [OperatorType.AND, OperatorType.OR]
+
+class Update:
+    __kind: UpdateKind
+    __operation: Operation
+    __constant: any
+
+    def __init__(self, kind: UpdateKind, operation: Operation):
+        self.__kind = kind
+        self.__operation = operation
+        self.__constant = constant_value(operation.rhs)
+
+    @property
+    def kind(self) -> UpdateKind:
+        return self.__kind
+
+    @property
+    def operation(self) -> Operation:
+        return self.__operation
+
+    @property
+    def identifier(self) -> Identifier:
+        return self.__operation.lhs.identifier
+
+    @property
+    def operand(self) -> Statement:
+        return self.__operation.rhs
+
+    @property
+    def constant(self) -> any:
+        return self.__constant
+
+    def __str__(self) -> str:
+        return f"Update({self.__kind.name},{self.__operation})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+def is_leaf(statement: Statement) -> bool:
+    if type(statement) == IdentifierStatement: return True
+
+    return not constant_value(statement) is UNDEFINED
+
+def find_update(statement: Assignment) -> Update:
+    operation = statement.statements
+
+    if not type(operation) == Operation or operation.operator_type in UNFUSED_OPERATORS:
+        return None
+
+    lhs = operation.lhs
+    rhs = operation.rhs
+
+    if not type(lhs) == IdentifierStatement or not lhs.identifier.value == statement.identifier.value:
+        return None
+
+    value = constant_value(rhs)
+
+    if not value is UNDEFINED:
+        if operation.operator_type in [OperatorType.PLUS, OperatorType.MINUS] and type(value) == int:
+            return Update(UpdateKind.INCREMENT, operation)
+
+        return Update(UpdateKind.CONSTANT, operation)
+    elif type(rhs) == IdentifierStatement:
+        return Update(UpdateKind.VARIABLE, operation)
+    elif type(rhs) == Operation and not rhs.operator_type in UNFUSED_OPERATORS and is_leaf(rhs.lhs) and is_leaf(rhs.rhs):
+        return Update(UpdateKind.OPERATION, operation)
+
+    return None
+
+class UpdateFuser(TreeRewriter):
+    __fused: int
+
+    def __init__(self):
+        self.__fused = 0
+
+    @property
+    def fused(self) -> int:
+        return self.__fused
+
+    def fuse(self, ast: Statement) -> Statement:
+        return self.visit(ast)
+
+    def visit_assignment(self, statement: Assignment) -> Statement:
+        update = find_update(statement)
+
+        if update == None: return statement
+
+        self.__fused += 1
+
+        # An unchanged assignment is shared with the tree being optimized, so the update goes on a new node.
+        assignment = rebuild_assignment(statement, statement.statements, force=True)
+        assignment.update = update
+
+        return assignment
@@ -0,0 +1,86 @@
+from .statements import Common, Constant, IdentifierStatement, Invariant, LiteralStatement, Loop, Operation, Statement
+from .analysis import assigned_names
+from .rewriting import TreeRewriter, rebuild_loop
+from typing import List, Set, Tuple
+
+def operand_names(statement: Statement) -> Set[str]:
+    statement_type = type(statement)
+
+    if statement_type == IdentifierStatement:
+        return {statement.identifier.value}
+    elif statement_type == LiteralStatement or statement_type == Constant:
+        return set()
+    elif statement_type == Operation:
+        lhs = operand_names(statement.lhs)
+        rhs = operand_names(statement.rhs)
+
+        if lhs == None or rhs == None: return None
+
+        return lhs | rhs
+    elif statement_type == Invariant or statement_type == Common:
+        return operand_names(statement.statement)
+
+    # Anything else may read input or assign, so it is never hoisted.
+    return None
+
+class InvariantHoister(TreeRewriter):
+    __loops: List[Tuple[Set[str], List[int]]]
+    __temporaries: int
+    __hoisted: int
+
+    def __init__(self):
+        self.__loops = []
+        self.__temporaries = 0
+        self.__hoisted = 0
+
+    @property
+    def hoisted(self) -> int:
+        return self.__hoisted
+
+    def temporary(self) -> int:
+        index = self.__temporaries
+        self.__temporaries += 1
+
+        return index
+
+    def hoist(self, ast: Statement) -> Statement:
+        return self.visit(ast)
+
+    def level(self, statement: Operation) -> int:
+        names = operand_names(statement)
+
+        if names == None or len(names) == 0: return None
+
+        level = None
+
+        # The outermost enclosing loop that assigns none of the operands, through every inner loop.
+        for i in range(len(self.__loops) - 1, -1, -1):
+            if names & self.__loops[i][0]: break
+
+            level = i
+
+        return level
+
+    def visit_operation(self, statement: Operation) -> Statement:
+        level = self.level(statement)
+
+        if not level == None:
+            index = self.temporary()
+            self.__hoisted += 1
+            self.__loops[level][1].append(index)
+
+            return Invariant(statement, index)
+
+        return super().visit_operation(statement)
+
+    def visit_loop(self, statement: Loop) -> Statement:
+        self.__loops.append((assigned_names(statement), []))
+
+        condition = self.visit(statement.condition)
+        body = self.visit(statement.statement)
+        _, invariants = self.__loops.pop()
+
+        loop = rebuild_loop(statement, condition, body, force=len(invariants) > 0)
+        loop.invariants = statement.invariants + tuple(invariants)
+
+        return loop
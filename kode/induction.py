@@ -0,0 +1,135 @@
+from .statements import Assignment, IdentifierStatement, Loop, Operation, Statement, Statements
+from .tokens import Identifier, OperatorType
+from .analysis import assigned_names, constant_value
+from .hoisting import operand_names
+from .rewriting import TreeRewriter, rebuild_loop
+
+class Induction:
+    __counter: Identifier
+    __condition: Operation
+    __counter_first: bool
+    __bound: Statement
+    __increment: Operation
+    __step: int
+    __body: Statement
+
+    def __init__(self, counter: Identifier, condition: Operation, counter_first: bool, increment: Operation, body: Statement):
+        self.__counter = counter
+        self.__condition = condition
+        self.__counter_first = counter_first
+        self.__bound = condition.rhs if counter_first else condition.lhs
+        self.__increment = increment
+        self.__step = constant_value(increment.rhs)
+        self.__body = body
+
+    @property
+    def counter(self) -> Identifier:
+        return self.__counter
+
+    @property
+    def condition(self) -> Operation:
+        return self.__condition
+
+    @property
+    def counter_first(self) -> bool:
+        return self.__counter_first
+
+    @property
+    def bound(self) -> Statement:
+        return self.__bound
+
+    @property
+    def increment(self) -> Operation:
+        return self.__increment
+
+    @property
+    def step(self) -> int:
+        return self.__step
+
+    @property
+    def body(self) -> Statement:
+        return self.__body
+
+    @property
+    def ascending(self) -> bool:
+        # COUNTER LESS THAN BOUND or BOUND GREATER THAN COUNTER, stepping up.
+        operator = OperatorType.LESS if self.__counter_first else OperatorType.GREATER
+
+        return self.__condition.operator_type == operator and self.__increment.operator_type == OperatorType.PLUS and self.__step > 0
+
+    def __str__(self) -> str:
+        return f"Induction({self.__counter.value},{self.__bound},{self.__step})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+def is_counter(statement: Statement, name: str) -> bool:
+    return type(statement) == IdentifierStatement and statement.identifier.value == name
+
+def find_induction(loop: Loop) -> Induction:
+    condition = loop.condition
+
+    if not type(condition) == Operation or not condition.operator_type in [OperatorType.LESS, OperatorType.GREATER]:
+        return None
+
+    statements = list(loop.statement) if type(loop.statement) == Statements else [loop.statement]
+
+    if len(statements) == 0 or not type(statements[-1]) == Assignment: return None
+
+    assignment = statements[-1]
+    name = assignment.identifier.value
+    increment = assignment.statements
+
+    # The counter only changes by a constant integer step at the end of every iteration.
+    if not type(increment) == Operation or not increment.operator_type in [OperatorType.PLUS, OperatorType.MINUS]:
+        return None
+
+    if not is_counter(increment.lhs, name) or not type(constant_value(increment.rhs)) == int:
+        return None
+
+    if is_counter(condition.lhs, name):
+        counter_first = True
+    elif is_counter(condition.rhs, name):
+        counter_first = False
+    else:
+        return None
+
+    # The identifier of the condition is the one reported when the counter is not defined.
+    counter = condition.lhs if counter_first else condition.rhs
+    body = Statements(statements[:-1])
+    names = operand_names(condition.rhs if counter_first else condition.lhs)
+
+    # The bound is read once per entry, so nothing it reads may change inside the loop.
+    if names == None or names & assigned_names(loop): return None
+
+    if name in assigned_names(body): return None
+
+    return Induction(counter.identifier, condition, counter_first, increment, body)
+
+class InductionAnalyzer(TreeRewriter):
+    __counted: int
+
+    def __init__(self):
+        self.__counted = 0
+
+    @property
+    def counted(self) -> int:
+        return self.__counted
+
+    def analyze(self, ast: Statement) -> Statement:
+        return self.visit(ast)
+
+    def visit_loop(self, statement: Loop) -> Statement:
+        condition = self.visit(statement.condition)
+        body = self.visit(statement.statement)
+        loop = rebuild_loop(statement, condition, body, force=True)
+        loop.induction = find_induction(loop)
+
+        if loop.induction == None:
+            if condition is statement.condition and body is statement.statement: return statement
+
+            return loop
+
+        self.__counted += 1
+
+        return loop
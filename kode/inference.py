@@ -0,0 +1,228 @@
+from .statements import Assignment, Common, Conditional, Constant, IdentifierStatement, Input, Invariant, LiteralStatement, Loop, Operation, Show, Statement, Statements
+from .tokens import LiteralType, OperatorType
+from .runtime import SPECIALIZED_OPERATORS, literal_type
+from .rewriting import TreeRewriter, rebuild_operation
+from .errors import ParseError
+from typing import Callable, Dict, FrozenSet, Tuple
+
+Types = FrozenSet[LiteralType]
+
+NO_TYPES: Types = frozenset()
+ALL_TYPES: Types = frozenset(LiteralType)
+NUMBER_TYPES: Types = frozenset([LiteralType.INTEGER, LiteralType.BOOLEAN, LiteralType.FLOAT])
+INTEGER_TYPES: Types = frozenset([LiteralType.INTEGER, LiteralType.BOOLEAN])
+
+def arithmetic_type(lhs: LiteralType, rhs: LiteralType) -> Types:
+    if not lhs in NUMBER_TYPES or not rhs in NUMBER_TYPES: return NO_TYPES
+
+    if LiteralType.FLOAT in [lhs, rhs]: return frozenset([LiteralType.FLOAT])
+
+    return frozenset([LiteralType.INTEGER])
+
+def result_types(operator: OperatorType, lhs: LiteralType, rhs: LiteralType) -> Types:
+    # Combinations that always raise produce no value, so they add no type.
+    if operator == OperatorType.PLUS:
+        if lhs == LiteralType.STRING:
+            return frozenset([LiteralType.STRING])
+        elif lhs in [LiteralType.INTEGER, LiteralType.FLOAT]:
+            return frozenset([lhs]) if not rhs == LiteralType.NONE else NO_TYPES
+
+        return arithmetic_type(lhs, rhs)
+    elif operator in [OperatorType.MINUS, OperatorType.DIVIDE]:
+        return arithmetic_type(lhs, rhs)
+    elif operator == OperatorType.TIMES:
+        if LiteralType.STRING in [lhs, rhs] and (lhs in INTEGER_TYPES or rhs in INTEGER_TYPES):
+            return frozenset([LiteralType.STRING])
+
+        return arithmetic_type(lhs, rhs)
+    elif operator == OperatorType.MOD:
+        if lhs == LiteralType.STRING: return frozenset([LiteralType.STRING])
+
+        return arithmetic_type(lhs, rhs)
+    elif operator == OperatorType.EQUALS:
+        return frozenset([LiteralType.BOOLEAN])
+    elif operator in [OperatorType.GREATER, OperatorType.LESS]:
+        if lhs in NUMBER_TYPES and rhs in NUMBER_TYPES or lhs == rhs == LiteralType.STRING:
+            return frozenset([LiteralType.BOOLEAN])
+
+        return NO_TYPES
+    elif operator in [OperatorType.AND, OperatorType.OR]:
+        return frozenset([lhs, rhs])
+    elif operator in [OperatorType.XOR, OperatorType.BAND, OperatorType.BOR]:
+        if not lhs in INTEGER_TYPES or not rhs in INTEGER_TYPES: return NO_TYPES
+
+        return frozenset([LiteralType.BOOLEAN if lhs == rhs == LiteralType.BOOLEAN else LiteralType.INTEGER])
+    elif operator in [OperatorType.SHL, OperatorType.SHR]:
+        if not lhs in INTEGER_TYPES or not rhs in INTEGER_TYPES: return NO_TYPES
+
+        return frozenset([LiteralType.INTEGER])
+    elif operator == OperatorType.INDEX:
+        if lhs == LiteralType.STRING and rhs == LiteralType.INTEGER:
+            return frozenset([LiteralType.STRING])
+
+        return NO_TYPES
+
+    return ALL_TYPES
+
+OperandTypes = Tuple[LiteralType, LiteralType]
+
+class TypeAnnotator(TreeRewriter):
+    __operand_types: Dict[int, OperandTypes]
+
+    def __init__(self, operand_types: Dict[int, OperandTypes]):
+        self.__operand_types = operand_types
+
+    def visit(self, statement: Statement) -> Statement:
+        statement_type = type(statement)
+
+        if statement_type == Invariant:
+            inner = self.visit(statement.statement)
+
+            return statement if inner is statement.statement else Invariant(inner, statement.index)
+        elif statement_type == Common:
+            inner = self.visit(statement.statement)
+
+            return statement if inner is statement.statement else Common(inner, statement.index, statement.first)
+
+        return super().visit(statement)
+
+    def visit_operation(self, statement: Operation) -> Statement:
+        operand_types = self.__operand_types.get(id(statement))
+        lhs = self.visit(statement.lhs)
+        rhs = self.visit(statement.rhs)
+
+        # Unchanged nodes are shared with the tree being optimized, so an annotation always goes on a new node.
+        operation = rebuild_operation(statement, lhs, rhs, force=not operand_types == statement.operand_types)
+
+        if not operation is statement: operation.operand_types = operand_types
+
+        return operation
+
+class TypeInference:
+    __variables: Dict[str, Types]
+    __operand_types: Dict[int, OperandTypes]
+    __changed: bool
+    __tagged: int
+    __specialized: int
+
+    def __init__(self):
+        # Kept across calls, a statement of a stream only sees values stored by itself and earlier statements.
+        self.__variables = {}
+        self.__operand_types = {}
+        self.__changed = False
+        self.__tagged = 0
+        self.__specialized = 0
+
+    @property
+    def specialized(self) -> int:
+        return self.__specialized
+
+    def infer(self, ast: Statement) -> Statement:
+        # Variable types only grow, so the walk is repeated until no assignment adds a type.
+        while True:
+            self.__changed = False
+            self.__tagged = 0
+            self.__operand_types = {}
+            self.visit(ast)
+
+            if not self.__changed: break
+
+        self.__specialized += self.__tagged
+
+        return TypeAnnotator(self.__operand_types).visit(ast)
+
+    def visit(self, statement: Statement) -> Types:
+        visit_method = STATEMENT_INFERENCES.get(type(statement))
+
+        if visit_method == None: return ALL_TYPES
+
+        return visit_method(self, statement)
+
+    def visit_literal(self, statement: LiteralStatement) -> Types:
+        try:
+            return frozenset([statement.literal.enum_type])
+        except ParseError:
+            return NO_TYPES
+
+    def visit_constant(self, statement: Constant) -> Types:
+        return frozenset([literal_type(statement.value)])
+
+    def visit_identifier(self, statement: IdentifierStatement) -> Types:
+        return self.__variables.get(statement.identifier.value, NO_TYPES)
+
+    def visit_input(self, statement: Input) -> Types:
+        return ALL_TYPES
+
+    def visit_invariant(self, statement: Invariant) -> Types:
+        return self.visit(statement.statement)
+
+    def visit_common(self, statement: Common) -> Types:
+        return self.visit(statement.statement)
+
+    def visit_operation(self, statement: Operation) -> Types:
+        lhs = self.visit(statement.lhs)
+        rhs = self.visit(statement.rhs)
+        operator = statement.operator_type
+        operand_types = None
+
+        if len(lhs) == 1 and len(rhs) == 1:
+            key = (operator, *lhs, *rhs)
+
+            if key in SPECIALIZED_OPERATORS:
+                operand_types = key[1:]
+                self.__tagged += 1
+
+        self.__operand_types[id(statement)] = operand_types
+
+        return frozenset().union(*[result_types(operator, l, r) for l in lhs for r in rhs])
+
+    def visit_statements(self, statement: Statements) -> Types:
+        types = frozenset([LiteralType.STRING])
+
+        for s in statement:
+            types = self.visit(s)
+
+        return types
+
+    def visit_assignment(self, statement: Assignment) -> Types:
+        types = self.visit(statement.statements)
+        name = statement.identifier.value
+        variable = self.__variables.get(name, NO_TYPES)
+
+        if not types <= variable:
+            self.__variables[name] = variable | types
+            self.__changed = True
+
+        return types
+
+    def visit_show(self, statement: Show) -> Types:
+        return self.visit(statement.statements)
+
+    def visit_conditional(self, statement: Conditional) -> Types:
+        self.visit(statement.condition)
+        types = self.visit(statement.pass_statement)
+
+        if statement.fail_statement:
+            return types | self.visit(statement.fail_statement)
+
+        return types | frozenset([LiteralType.NONE])
+
+    def visit_loop(self, statement: Loop) -> Types:
+        self.visit(statement.condition)
+
+        return self.visit(statement.statement) | frozenset([LiteralType.NONE])
+
+STATEMENT_INFERENCES: Dict[type, Callable[[TypeInference, Statement], Types]] = {
+    Statements: TypeInference.visit_statements,
+    Conditional: TypeInference.visit_conditional,
+    Loop: TypeInference.visit_loop,
+    Assignment: TypeInference.visit_assignment,
+    Operation: TypeInference.visit_operation,
+    Show: TypeInference.visit_show,
+    LiteralStatement: TypeInference.visit_literal,
+    Constant: TypeInference.visit_constant,
+    IdentifierStatement: TypeInference.visit_identifier,
+    Input: TypeInference.visit_input,
+    Invariant: TypeInference.visit_invariant,
+    Common: TypeInference.visit_common
+}
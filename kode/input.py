@@ -0,0 +1,101 @@
+from abc import ABC
+from collections import deque
+from typing import Deque, Iterable, TextIO
+import json
+import os
+import stat
+
+def can_read_blocks(stream: TextIO) -> bool:
+    try:
+        return stat.S_ISREG(os.fstat(stream.fileno()).st_mode)
+    except (OSError, ValueError):
+        # Streams without a file, like StringIO, already hold all of their data.
+        return True
+
+class InputSource(ABC):
+    def read(self) -> str:
+        return None
+
+    def __call__(self) -> str:
+        return self.read()
+
+class DequeSource(InputSource):
+    __lines: Deque[str]
+
+    def __init__(self, lines: Iterable[str] = ()):
+        self.__lines = deque(lines)
+
+    def push(self, line: str):
+        self.__lines.append(line)
+
+    def read(self) -> str:
+        if len(self.__lines) == 0: return None
+
+        return self.__lines.popleft()
+
+class FileSource(InputSource):
+    __stream: TextIO
+    __block_size: int
+    __lines: Deque[str]
+    __tail: str
+    __eof: bool
+
+    def __init__(self, stream: TextIO, block_size: int = 1 << 16):
+        # Block reads wait for a full block, anything but a regular file, like a terminal or a pipe, has to be read line by line.
+        if not can_read_blocks(stream): block_size = 0
+
+        self.__stream = stream
+        self.__block_size = block_size
+        self.__lines = deque()
+        self.__tail = ""
+        self.__eof = False
+
+    def read(self) -> str:
+        if self.__block_size <= 0:
+            line = self.__stream.readline()
+
+            if len(line) == 0: return None
+
+            return line[:-1] if line.endswith("\n") else line
+
+        lines = self.__lines
+
+        while len(lines) == 0:
+            if self.__eof:
+                if len(self.__tail) == 0: return None
+
+                line, self.__tail = self.__tail, ""
+
+                return line
+
+            chunk = self.__stream.read(self.__block_size)
+
+            if len(chunk) == 0:
+                self.__eof = True
+                continue
+
+            parts = (self.__tail + chunk).split("\n")
+            self.__tail = parts.pop()
+            lines.extend(parts)
+
+        return lines.popleft()
+
+class ReplaySource(DequeSource):
+    def __init__(self, stream: TextIO):
+        super().__init__(json.loads(line) for line in stream if line.strip())
+
+class RecordingSource(InputSource):
+    __source: InputSource
+    __stream: TextIO
+
+    def __init__(self, source: InputSource, stream: TextIO):
+        self.__source = source
+        self.__stream = stream
+
+    def read(self) -> str:
+        line = self.__source.read()
+
+        self.__stream.write(json.dumps(line) + "\n")
+        self.__stream.flush()
+
+        return line
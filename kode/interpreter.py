@@ -1,70 +1,18 @@
-from kode.utils import print_span
-from .statements import Conditional, IdentifierStatement, Input, LiteralStatement, Loop, Statement, Statements, Assignment, Operation, Show, statementize
-from .tokens import Identifier, Literal, LiteralType, OperatorType, tokenize
-from .span import Span, spanize
+from kode.utils import print_span, print_statistics
+from .statements import Common, Conditional, Constant, IdentifierStatement, Input, Invariant, LiteralStatement, Loop, Statement, Statements, Assignment, Operation, Show, statementize_stream
+from .tokens import LiteralType, OperatorType
+from .lexer import lex, StreamLexer
+from .parser import parse_tokens
 from .errors import ParseError, InterpreterError, handle_error
-from typing import Dict, List, Callable
+from .runtime import SHORT_CIRCUITS, SKIPPED_NAMES, SPECIALIZED_OPERATORS, Value, checked_operator_function, parse_input
+from .frame import Frame, UNDEFINED
+from .analysis import ScopeAnalyzer
+from .fusion import UPDATE_NAMES, Update, UpdateKind
+from .optimizer import MAX_UNROLLED_TRIPS, Optimizer
+from .output import BufferSink, OutputSink, StreamSink, TeeSink
+from typing import Dict, Callable, TextIO, Tuple, Type
 from abc import ABC
-
-def get_literal(value: any, spanned_objects: list):
-    if type(value) == Literal: raise RuntimeError("Passing a literal.")
-    if type(value) == str: value = '"' + value + '"'
-
-    spans: List[Span] = []
-
-    for so in spanned_objects:
-        if type(so) == Span:
-            spans.append(so)
-        else:
-            spans.append(so.span)
-
-    starts = [span.start for span in spans]
-    ends = [span.end for span in spans]
-
-    return Literal(
-        Span(
-            value=str(value),
-            file_path=spans[0].file_path,
-            start=min(starts),
-            end=max(ends)
-        )
-    )
-
-class Scope:
-    __values: Dict[str, any]
-    __depths: List[List[str]]
-
-    def __init__(self):
-        self.__values = {}
-        self.__depths = [[]]
-
-    def push(self):
-        self.__depths.append([])
-
-    def pop(self):
-        if len(self.__depths) <= 1: return
-
-        old_keys = self.__depths.pop()
-
-        for key in old_keys:
-            del self.__values[key]
-
-    def put(self, key: Identifier, value: any):
-        if not key.value in self.__values:
-            self.__depths[-1].append(key.value)
-
-        self.__values[key.value] = value
-
-    def get(self, key: Identifier) -> any:
-        if not key.value in self.__values: raise InterpreterError(key.span, f"Variable {key.value} not defined.")
-
-        return self.__values[key.value]
-
-    def __repr__(self) -> str:
-        return str(self)
-
-    def __str__(self) -> str:
-        return f"Scope({self.__values},{self.__depths})"
+import sys
 
 class StatementInterpreter(ABC):
     _statement: Statement
@@ -82,30 +30,77 @@ class StatementsInterpreter(StatementInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == Statements
 
-    def interpret(self, interpreter: 'Interpreter'):
-        outputs = []
-        spanned_objects = []
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        output = None
 
         for statement in self._statement:
-            spanned_objects.append(statement)
             output = interpreter.run(statement)
-            outputs.append(output)
 
-        if len(outputs) == 0:
-            return Literal(Span(value="", file_path=None, start=0, end=0))
+        if output == None:
+            return Value(LiteralType.STRING, "", self._statement)
         else:
-            return outputs[-1]
+            return output
+
+class SlotInterpreter(StatementInterpreter):
+    __binding: Tuple[Frame, int]
+
+    def __init__(self, statement: Statement):
+        super().__init__(statement)
+        self.__binding = (None, None)
+
+    def _bind(self, interpreter: 'Interpreter') -> Tuple[Frame, int]:
+        # The slot is resolved once per frame, a single assignment keeps shared nodes consistent.
+        binding = self.__binding
+
+        if not binding[0] is interpreter.scope:
+            binding = (interpreter.scope, interpreter.scope.slot(self._statement.identifier))
+            self.__binding = binding
+
+        return binding
+
+class AssignmentInterpreter(SlotInterpreter):
+    __update: Update
+    __function: Callable[[any, any], any]
+
+    def __init__(self, statement: Assignment):
+        super().__init__(statement)
+
+        self.__update = statement.update
+        self.__function = None
+
+        if not self.__update == None:
+            self.__function = checked_operator_function(self.__update.operation)
 
-class AssignmentInterpreter(StatementInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == Assignment
 
-    def interpret(self, interpreter: 'Interpreter'):
-        literal = interpreter.run(self._statement.statements)
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        if self.__update: return self.update(interpreter)
+
+        value = interpreter.run(self._statement.statements)
+        frame, slot = self._bind(interpreter)
+
+        frame.store(slot, value.value)
+
+        return value.with_origin(self._statement)
 
-        interpreter.scope.put(self._statement.identifier, literal.value)
+    def update(self, interpreter: 'Interpreter') -> Value:
+        update = self.__update
+        frame, slot = self._bind(interpreter)
+        values = frame.values
+        value = values[slot]
 
-        return literal + self._statement.span
+        # The variable is read first like the operation would, and being defined it needs no trail when stored.
+        if value is UNDEFINED: frame.load(slot, update.identifier)
+
+        operand = update.constant
+
+        if operand is UNDEFINED: operand = interpreter.run(update.operand).value
+
+        value = values[slot] = self.__function(value, operand)
+        interpreter.fused[update.kind] += 1
+
+        return Value.of(value, self._statement)
 
 class OperatorInterpreter(ABC):
     @classmethod
@@ -113,7 +108,7 @@ class OperatorInterpreter(ABC):
         return False
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return None
 
 class PlusInterpreter(OperatorInterpreter):
@@ -122,7 +117,7 @@ class PlusInterpreter(OperatorInterpreter):
         return operator == OperatorType.PLUS
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         if lhs.enum_type == LiteralType.STRING:
             return lhs.value + str(rhs.value)
         elif lhs.enum_type == LiteralType.FLOAT:
@@ -138,7 +133,7 @@ class MinusInterpreter(OperatorInterpreter):
         return operator == OperatorType.MINUS
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value - rhs.value
 
 class TimesInterpreter(OperatorInterpreter):
@@ -147,7 +142,7 @@ class TimesInterpreter(OperatorInterpreter):
         return operator == OperatorType.TIMES
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value * rhs.value
 
 class DivideInterpreter(OperatorInterpreter):
@@ -156,7 +151,7 @@ class DivideInterpreter(OperatorInterpreter):
         return operator == OperatorType.DIVIDE
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value // rhs.value
 
 class ModInterpreter(OperatorInterpreter):
@@ -165,7 +160,7 @@ class ModInterpreter(OperatorInterpreter):
         return operator == OperatorType.MOD
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value % rhs.value
 
 class EqualsInterpreter(OperatorInterpreter):
@@ -174,7 +169,7 @@ class EqualsInterpreter(OperatorInterpreter):
         return operator == OperatorType.EQUALS
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         if lhs.enum_type == LiteralType.NONE and rhs.enum_type == LiteralType.NONE:
             return True
 
@@ -186,7 +181,7 @@ class GreaterInterpreter(OperatorInterpreter):
         return operator == OperatorType.GREATER
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value > rhs.value
 
 class LessInterpreter(OperatorInterpreter):
@@ -195,7 +190,7 @@ class LessInterpreter(OperatorInterpreter):
         return operator == OperatorType.LESS
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value < rhs.value
 
 class AndInterpreter(OperatorInterpreter):
@@ -204,7 +199,7 @@ class AndInterpreter(OperatorInterpreter):
         return operator == OperatorType.AND
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value and rhs.value
 
 class OrInterpreter(OperatorInterpreter):
@@ -213,7 +208,7 @@ class OrInterpreter(OperatorInterpreter):
         return operator == OperatorType.OR
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value or rhs.value
 
 class BorInterpreter(OperatorInterpreter):
@@ -222,7 +217,7 @@ class BorInterpreter(OperatorInterpreter):
         return operator == OperatorType.BOR
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value | rhs.value
 
 class BandInterpreter(OperatorInterpreter):
@@ -231,7 +226,7 @@ class BandInterpreter(OperatorInterpreter):
         return operator == OperatorType.BAND
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value & rhs.value
 
 class XorInterpreter(OperatorInterpreter):
@@ -240,7 +235,7 @@ class XorInterpreter(OperatorInterpreter):
         return operator == OperatorType.XOR
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value ^ rhs.value
 
 class ShlInterpreter(OperatorInterpreter):
@@ -249,7 +244,7 @@ class ShlInterpreter(OperatorInterpreter):
         return operator == OperatorType.SHL
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value << rhs.value
 
 class ShrInterpreter(OperatorInterpreter):
@@ -258,7 +253,7 @@ class ShrInterpreter(OperatorInterpreter):
         return operator == OperatorType.SHR
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         return lhs.value >> rhs.value
 
 class IndexInterpreter(OperatorInterpreter):
@@ -267,7 +262,7 @@ class IndexInterpreter(OperatorInterpreter):
         return operator == OperatorType.INDEX
 
     @classmethod
-    def interpret(cls, lhs: Literal, rhs: Literal) -> any:
+    def interpret(cls, lhs: Value, rhs: Value) -> any:
         if not lhs.enum_type in [LiteralType.STRING]:
             raise InterpreterError(lhs.span, f"Cannot index {lhs.enum_type}.")
 
@@ -276,229 +271,443 @@ class IndexInterpreter(OperatorInterpreter):
 
         return lhs.value[rhs.value]
 
-OPERATOR_INTERPRETERS = [
-    PlusInterpreter,
-    MinusInterpreter,
-    TimesInterpreter,
-    DivideInterpreter,
-    ModInterpreter,
-    EqualsInterpreter,
-    GreaterInterpreter,
-    LessInterpreter,
-    AndInterpreter,
-    OrInterpreter,
-    BandInterpreter,
-    BorInterpreter,
-    XorInterpreter,
-    ShlInterpreter,
-    ShrInterpreter,
-    IndexInterpreter
-]
+OPERATOR_INTERPRETERS: Dict[OperatorType, Type[OperatorInterpreter]] = {
+    OperatorType.PLUS: PlusInterpreter,
+    OperatorType.MINUS: MinusInterpreter,
+    OperatorType.TIMES: TimesInterpreter,
+    OperatorType.DIVIDE: DivideInterpreter,
+    OperatorType.MOD: ModInterpreter,
+    OperatorType.EQUALS: EqualsInterpreter,
+    OperatorType.GREATER: GreaterInterpreter,
+    OperatorType.LESS: LessInterpreter,
+    OperatorType.AND: AndInterpreter,
+    OperatorType.OR: OrInterpreter,
+    OperatorType.BAND: BandInterpreter,
+    OperatorType.BOR: BorInterpreter,
+    OperatorType.XOR: XorInterpreter,
+    OperatorType.SHL: ShlInterpreter,
+    OperatorType.SHR: ShrInterpreter,
+    OperatorType.INDEX: IndexInterpreter
+}
 
 class OperationInterpreter(StatementInterpreter):
+    __operator_interpreter: Type[OperatorInterpreter]
+    __specialized: Tuple[Callable[[any, any], any], LiteralType]
+    __short_circuit: bool
+
+    def __init__(self, statement: Operation):
+        super().__init__(statement)
+
+        operator = statement.operator_type
+        self.__operator_interpreter = OPERATOR_INTERPRETERS.get(operator)
+        self.__specialized = None
+        self.__short_circuit = SHORT_CIRCUITS.get(operator)
+
+        if self.__operator_interpreter == None:
+            raise InterpreterError(statement.operator.span, f"Unimplemented operator {operator}.")
+
+        if not statement.operand_types == None:
+            self.__specialized = SPECIALIZED_OPERATORS[(operator, *statement.operand_types)]
+
     def can_interpret(self) -> bool:
         return type(self._statement) == Operation
 
-    def interpret(self, interpreter: 'Interpreter') -> Literal:
+    def interpret(self, interpreter: 'Interpreter') -> Value:
         lhs = interpreter.run(self._statement.lhs)
+
+        if not self.__short_circuit == None:
+            if bool(lhs.value) == self.__short_circuit:
+                interpreter.skipped[self._statement.operator_type] += 1
+
+                return lhs.with_origin(self._statement)
+
+            # A left operand that does not decide the result leaves it to the right one.
+            return interpreter.run(self._statement.rhs).with_origin(self._statement)
+
         rhs = interpreter.run(self._statement.rhs)
 
-        operator: OperatorType = self._statement.operator.enum_type
+        # Proven operand types need neither the operator checks nor a lookup of the result type.
+        if self.__specialized:
+            function, result_type = self.__specialized
 
-        for OP in OPERATOR_INTERPRETERS:
-            if OP.can_interpret(operator):
-                value = OP.interpret(lhs, rhs)
+            return Value(result_type, function(lhs.value, rhs.value), self._statement)
 
-                return get_literal(value, spanned_objects=[lhs, rhs])
-        else:
-            raise InterpreterError(op_tree[1].span, f"Unimplemented operator {operator}.")
+        value = self.__operator_interpreter.interpret(lhs, rhs)
+
+        return Value.of(value, self._statement)
 
 class ShowInterpreter(StatementInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == Show
 
-    def interpret(self, interpreter: 'Interpreter'):
-        literal = interpreter.run(self._statement.statements)
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        value = interpreter.run(self._statement.statements)
 
-        interpreter.display(literal.value)
+        interpreter.display(value.value)
 
-        return literal + self._statement.span
+        return value.with_origin(self._statement)
 
 class InputInterpreter(StatementInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == Input
 
-    def interpret(self, interpreter: 'Interpreter'):
+    def interpret(self, interpreter: 'Interpreter') -> Value:
         value = interpreter.read()
         
         # TODO: Maybe we want this behaviour?
         # if value == None:
             # raise InterpreterError(self._statement.span, "Could not get input.")
 
-        if not value:
-            value = "None"
-        elif value.isalpha():
-            value = '"' + value + '"'
+        return Value.of(parse_input(value, self._statement.span), self._statement)
 
-        span = self._statement.span
-        span.value = value
+class LiteralInterpreter(StatementInterpreter):
+    __value: Value
 
-        return Literal(span)
+    def __init__(self, statement: LiteralStatement):
+        super().__init__(statement)
+        self.__value = None
 
-class LiteralInterpreter(StatementInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == LiteralStatement
 
-    def interpret(self, interpreter: 'Interpreter'):
-        literal = self._statement.literal
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        if self.__value == None:
+            literal = self._statement.literal
+            self.__value = Value(literal.enum_type, literal.value, self._statement)
+
+        return self.__value
+
+class ConstantInterpreter(StatementInterpreter):
+    __value: Value
+
+    def __init__(self, statement: Constant):
+        super().__init__(statement)
+        self.__value = Value.of(statement.value, statement)
+
+    def can_interpret(self) -> bool:
+        return type(self._statement) == Constant
+
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        return self.__value
+
+class InvariantInterpreter(StatementInterpreter):
+    def can_interpret(self) -> bool:
+        return type(self._statement) == Invariant
+
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        frame = interpreter.scope
+        slot = frame.temporary(self._statement.index)
+        value = frame.values[slot]
+
+        # Computed on first use after the loop is entered, where the original expression would first raise.
+        if value is UNDEFINED:
+            value = interpreter.run(self._statement.statement)
+            frame.values[slot] = value
+
+        return value
 
-        return literal + self._statement.span
+class CommonInterpreter(StatementInterpreter):
+    def can_interpret(self) -> bool:
+        return type(self._statement) == Common
+
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        frame = interpreter.scope
+        slot = frame.temporary(self._statement.index)
+
+        if self._statement.first:
+            value = interpreter.run(self._statement.statement)
+            frame.values[slot] = value
+
+            return value
 
-class IdentifierInterpreter(StatementInterpreter):
+        # Stored by the first occurrence, errors about it point at this one.
+        return frame.values[slot].with_origin(self._statement.statement)
+
+class IdentifierInterpreter(SlotInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == IdentifierStatement
 
-    def interpret(self, interpreter: 'Interpreter'):
-        value = interpreter.scope.get(self._statement.identifier)
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        frame, slot = self._bind(interpreter)
+        value = frame.load(slot, self._statement.identifier)
 
-        return get_literal(value, spanned_objects=[self._statement])
+        return Value.of(value, self._statement)
 
 class ConditionalInterpreter(StatementInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == Conditional
 
-    def interpret(self, interpreter: 'Interpreter'):
-        interpreter.scope.push()
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        scoped = self._statement.scoped
+
+        if scoped: interpreter.scope.push()
 
-        literal = interpreter.run(self._statement.condition)
+        value = interpreter.run(self._statement.condition)
 
-        if not literal.enum_type == LiteralType.BOOLEAN: 
-            raise InterpreterError(literal.span, f"Cannot perform conditional with {literal.enum_type}.")
+        if not value.enum_type == LiteralType.BOOLEAN: 
+            raise InterpreterError(value.span, f"Cannot perform conditional with {value.enum_type}.")
 
-        if literal.value:
-            return_literal = interpreter.run(self._statement.pass_statement)
+        if value.value != self._statement.negated:
+            return_value = interpreter.run(self._statement.pass_statement)
         elif self._statement.fail_statement:
-            return_literal = interpreter.run(self._statement.fail_statement)
+            return_value = interpreter.run(self._statement.fail_statement)
         else:
-            new_span = self._statement.span
-            new_span.value = "None"
+            if scoped: interpreter.scope.pop()
 
-            interpreter.scope.pop()
+            return Value(LiteralType.NONE, None, self._statement)
 
-            return Literal(new_span)
-
-        interpreter.scope.pop()
+        if scoped: interpreter.scope.pop()
         
-        return return_literal + self._statement.span
+        return return_value.with_origin(self._statement)
 
 class LoopInterpreter(StatementInterpreter):
     def can_interpret(self) -> bool:
         return type(self._statement) == Loop
 
-    def interpret(self, interpreter: 'Interpreter'):
-        interpreter.scope.push()
+    def interpret(self, interpreter: 'Interpreter') -> Value:
+        scoped = self._statement.scoped
+
+        for index in self._statement.invariants:
+            interpreter.scope.values[interpreter.scope.temporary(index)] = UNDEFINED
+
+        if scoped: interpreter.scope.push()
+
+        if self._statement.induction == None:
+            last_value = self.iterate(interpreter)
+        else:
+            last_value = self.count(interpreter)
+
+        if scoped: interpreter.scope.pop()
+
+        if last_value == None:
+            return Value(LiteralType.NONE, None, self._statement)
+
+        return last_value.with_origin(self._statement)
 
+    def iterate(self, interpreter: 'Interpreter') -> Value:
         last_value = None
-        
+
         while True:
-            literal = interpreter.run(self._statement.condition)
+            value = interpreter.run(self._statement.condition)
 
-            if not literal.enum_type == LiteralType.BOOLEAN: raise InterpreterError(literal.span, f"Cannot perform loop conditional with {literal.enum_type}.")
+            if not value.enum_type == LiteralType.BOOLEAN: raise InterpreterError(value.span, f"Cannot perform loop conditional with {value.enum_type}.")
 
-            if literal.value == False: break
+            if value.value == False: break
 
             last_value = interpreter.run(self._statement.statement)
 
-        if last_value == None:
-            new_span = self._statement.span
-            new_span.value = "None"
+        return last_value
+
+    def count(self, interpreter: 'Interpreter') -> Value:
+        induction = self._statement.induction
+        frame = interpreter.scope
+        values = frame.values
+        slot = frame.slot(induction.counter)
+        compare = checked_operator_function(induction.condition)
+        advance = checked_operator_function(induction.increment)
+        step = induction.step
+        counter_first = induction.counter_first
+        last_value = None
+
+        # Operands are read in the order of the condition, so the same error is raised first.
+        if counter_first:
+            counter = frame.load(slot, induction.counter)
+            bound = interpreter.run(induction.bound).value
+        else:
+            bound = interpreter.run(induction.bound).value
+            counter = frame.load(slot, induction.counter)
 
-            interpreter.scope.pop()
+        # Only the step writes the counter and the bound is invariant, so the condition is a plain comparison.
+        while compare(counter, bound) if counter_first else compare(bound, counter):
+            interpreter.run(induction.body)
+            counter = advance(counter, step)
+            values[slot] = counter
+            last_value = counter
 
-            return Literal(new_span)
+        if last_value == None: return None
 
-        interpreter.scope.pop()
+        return Value.of(last_value, self._statement)
 
-        return last_value + self._statement.span
+STATEMENT_INTERPRETERS: Dict[type, Type[StatementInterpreter]] = {
+    Statements: StatementsInterpreter,
+    Conditional: ConditionalInterpreter,
+    Loop: LoopInterpreter,
+    Assignment: AssignmentInterpreter,
+    Operation: OperationInterpreter,
+    Show: ShowInterpreter,
+    LiteralStatement: LiteralInterpreter,
+    Constant: ConstantInterpreter,
+    Invariant: InvariantInterpreter,
+    Common: CommonInterpreter,
+    IdentifierStatement: IdentifierInterpreter,
+    Input: InputInterpreter
+}
 
-STATEMENT_INTERPRETERS = [
-    StatementsInterpreter,
-    ConditionalInterpreter,
-    LoopInterpreter,
-    AssignmentInterpreter, 
-    OperationInterpreter, 
-    ShowInterpreter,
-    LiteralInterpreter,
-    IdentifierInterpreter,
-    InputInterpreter
-]
+def register_statement_interpreter(statement_type: type, statement_interpreter: Type[StatementInterpreter]):
+    STATEMENT_INTERPRETERS[statement_type] = statement_interpreter
+
+def register_operator_interpreter(operator: OperatorType, operator_interpreter: Type[OperatorInterpreter]):
+    OPERATOR_INTERPRETERS[operator] = operator_interpreter
+
+def resolve_statement_interpreter(statement: Statement) -> StatementInterpreter:
+    statement_interpreter = statement.handler
+
+    if statement_interpreter == None:
+        SI = STATEMENT_INTERPRETERS.get(type(statement))
+
+        if SI == None:
+            raise InterpreterError(statement.span, "Cannot interpret statement.")
+
+        statement_interpreter = SI(statement)
+        statement.handler = statement_interpreter
+
+    return statement_interpreter
 
 class Interpreter:
     __ast: Statements
-    __stdout: str
-    __silent: bool
+    __output: OutputSink
     __debug: bool
-    __scope: Scope
+    __scope: Frame
+    __analyzer: ScopeAnalyzer
     __input_method: Callable[[], str]
+    __fused: Dict[UpdateKind, int]
+    __skipped: Dict[OperatorType, int]
+
+    def __init__(self, ast: Statements, silent: bool = False, debug: bool = False, input_method: Callable[[], str] = input, output: OutputSink = None):
+        if output == None:
+            output = BufferSink() if silent else TeeSink(BufferSink(), StreamSink(sys.stdout, buffer_size=0))
 
-    def __init__(self, ast: Statements, silent: bool = False, debug: bool = False, input_method: Callable[[], str] = input):
         self.__ast = ast
-        self.__stdout = ""
-        self.__silent = silent
+        self.__output = output
         self.__debug = debug
-        self.__scope = Scope()
+        self.__scope = Frame()
+        self.__analyzer = ScopeAnalyzer()
         self.__input_method = input_method
+        self.__fused = {kind: 0 for kind in UpdateKind}
+        self.__skipped = {operator: 0 for operator in SHORT_CIRCUITS}
+
+        self.prepare(ast)
 
     @property
-    def scope(self):
+    def ast(self) -> Statements:
+        return self.__ast
+
+    @property
+    def scope(self) -> Frame:
         return self.__scope
 
+    @property
+    def output(self) -> OutputSink:
+        return self.__output
+
     @property
     def stdout(self) -> str:
-        return self.__stdout
+        return self.__output.value
+
+    @property
+    def fused(self) -> Dict[UpdateKind, int]:
+        return self.__fused
+
+    @property
+    def skipped(self) -> Dict[OperatorType, int]:
+        return self.__skipped
+
+    @property
+    def statistics(self) -> Dict[str, any]:
+        return {
+            "Blocks": self.__analyzer.blocks,
+            "Scopes elided": self.__analyzer.elided,
+            # Engines that never fuse updates have nothing to report.
+            **{UPDATE_NAMES[kind]: count for kind, count in self.__fused.items() if count > 0},
+            **{SKIPPED_NAMES[operator]: count for operator, count in self.__skipped.items() if count > 0}
+        }
+
+    def prepare(self, ast: Statement):
+        self.__scope.resolve(ast)
+        self.__analyzer.analyze(ast)
 
     def read(self) -> str:
+        # Pending output has to be visible before the program waits for input.
+        self.__output.flush()
+
         return self.__input_method()
 
     def display(self, line: str, terminator: str = "\n"):
-        self.__stdout += str(line) + terminator
-
-        if not self.__silent: print(line, end=terminator)
+        self.__output.write(str(line) + terminator)
 
-    def run(self, ast: Statement = None) -> Literal:
+    def run(self, ast: Statement = None) -> Value:
         if ast == None: ast = self.__ast
 
-        for SI in STATEMENT_INTERPRETERS:
-            si = SI(ast)
+        value = resolve_statement_interpreter(ast).interpret(self)
 
-            if si.can_interpret():
-                literal = si.interpret(self)
+        if self.__debug:
+            print_span(value.span)
+            print("|", "Value:", value.value)
+            print("|")
 
-                if self.__debug:
-                    print_span(literal.span)
-                    print("|", "Value:", literal.value)
-                    print("|")
-
-                return literal
-
-        raise InterpreterError(ast.span, "Cannot interpret statement.")
+        return value
 
 def parse(source: str, file_path: str) -> Statements:
     try:
-        span = spanize(source, file_path)
-        tokens = tokenize(span)
-        ast = statementize(tokens)
+        tokens = lex(source, file_path)
+        ast = parse_tokens(tokens)
 
         return ast
     except ParseError as err:
         handle_error(err)
 
-def interpret(ast: Statements, debug: bool = False) -> any:
+def interpret(ast: Statements, debug: bool = False, engine: str = "tree", output: OutputSink = None, input_method: Callable[[], str] = input, optimize: bool = True, unroll_limit: int = MAX_UNROLLED_TRIPS) -> any:
+    from .engines import ENGINES
+
+    optimizer = Optimizer(unroll_limit=unroll_limit)
+
+    if optimize: ast = optimizer.optimize(ast)
+
+    interpreter = ENGINES[engine](
+        ast=ast,
+        debug=debug,
+        input_method=input_method,
+        output=output
+    )
+
     try:
-        interpeter = Interpreter(
-            ast=ast,
-            debug=debug
-        )
-        return interpeter.run()
+        result = interpreter.run()
     except InterpreterError as err:
+        interpreter.output.flush()
         handle_error(err)
+    finally:
+        interpreter.output.flush()
+
+    if debug: print_statistics({**interpreter.statistics, **optimizer.statistics})
+
+    return result
+
+def interpret_stream(reader: TextIO, file_path: str, debug: bool = False, engine: str = "tree", output: OutputSink = None, input_method: Callable[[], str] = input, optimize: bool = True, unroll_limit: int = MAX_UNROLLED_TRIPS) -> any:
+    from .engines import ENGINES
+
+    # Later statements are not read yet, so a variable cannot be known to be assigned only once.
+    optimizer = Optimizer(propagate=False, unroll_limit=unroll_limit)
+
+    interpreter = ENGINES[engine](
+        ast=Statements([]),
+        debug=debug,
+        input_method=input_method,
+        output=output
+    )
+    result = None
+
+    try:
+        for statement in statementize_stream(StreamLexer(reader, file_path).tokens()):
+            if optimize: statement = optimizer.optimize(statement)
+
+            interpreter.prepare(statement)
+            result = interpreter.run(statement)
+    except (ParseError, InterpreterError) as err:
+        interpreter.output.flush()
+        handle_error(err)
+    finally:
+        interpreter.output.flush()
+
+    if debug: print_statistics({**interpreter.statistics, **optimizer.statistics})
+
+    return result
@@ -0,0 +1,198 @@
+from .tokens import Identifier, Literal, Operator, OperatorType, Punctuation, PunctuationType, Reserved, ReservedType, Token, TokenStream, STRING_DELIMITERS
+from .span import Span
+from .errors import ParseError
+from typing import Iterator, TextIO
+import re
+
+WORD = re.compile(r"[^\s" + re.escape("".join(p.value for p in PunctuationType)) + r"]+")
+SPACE = re.compile(r"\s+")
+IDENTIFIER = re.compile(r"^[a-zA-Z_][a-zA-Z0-9_]*$")
+
+LITERAL_WORDS = ["TRUE", "FALSE", "NONE"]
+COMPARISON_WORDS = ["GREATER", "LESS"]
+
+class Lexer:
+    _source: str
+    _file_path: str
+    _cursor: int
+
+    def __init__(self, source: str, file_path: str):
+        self._source = source
+        self._file_path = file_path
+        self._cursor = 0
+
+    def span(self, start: int, end: int) -> Span:
+        return Span(
+            value=None,
+            file_path=self._file_path,
+            start=start,
+            end=end,
+            source=self._source
+        )
+
+    def word(self, start: int) -> str:
+        match = WORD.match(self._source, start)
+
+        if match == None: return ""
+
+        return match.group()
+
+    def tokens(self) -> Iterator[Token]:
+        while True:
+            token = self.next_token()
+
+            if token == None: return
+
+            yield token
+
+    def next_token(self) -> Token:
+        source = self._source
+        size = len(source)
+
+        while self._cursor < size:
+            c = source[self._cursor]
+
+            if c.isspace():
+                self._cursor = SPACE.match(source, self._cursor).end()
+            elif c in STRING_DELIMITERS:
+                return self.string()
+            elif c == PunctuationType.PERIOD.value:
+                self._cursor += 1
+                return Punctuation(self.span(self._cursor - 1, self._cursor))
+            elif c == PunctuationType.MINUS.value or self.word(self._cursor).isdigit():
+                return self.number()
+            else:
+                return self.keyword()
+
+        return None
+
+    def string(self) -> Literal:
+        start = self._cursor
+        terminator = self._source[start]
+        end = self._source.find(terminator, start + 1)
+
+        if end == -1:
+            raise ParseError(self.span(start, start + 1), f"String not closed.")
+
+        self._cursor = end + 1
+
+        return Literal(self.span(start, end + 1))
+
+    def number(self) -> Literal:
+        source = self._source
+        start = self._cursor
+        cursor = start
+
+        if source[cursor] == PunctuationType.MINUS.value:
+            cursor += 1
+
+        digits = self.word(cursor)
+
+        if digits.isdigit():
+            cursor += len(digits)
+
+        while cursor < len(source) and source[cursor] == PunctuationType.PERIOD.value:
+            digits = self.word(cursor + 1)
+
+            if not digits.isdigit(): break
+
+            cursor += 1 + len(digits)
+
+        self._cursor = cursor
+
+        return Literal(self.span(start, cursor))
+
+    def keyword(self) -> Token:
+        start = self._cursor
+        word = self.word(start)
+        end = start + len(word)
+        upper = word.upper()
+
+        self._cursor = end
+
+        if upper in LITERAL_WORDS:
+            return Literal(self.span(start, end))
+        elif upper in OperatorType._member_names_:
+            if upper in COMPARISON_WORDS:
+                return self.comparison(start, word)
+
+            return Operator(self.span(start, end))
+        elif upper in ReservedType._member_names_:
+            return Reserved(self.span(start, end))
+        elif IDENTIFIER.match(word):
+            return Identifier(self.span(start, end))
+        else:
+            raise ParseError(self.span(start, end), f"Unknown token type.")
+
+    def comparison(self, start: int, word: str) -> Operator:
+        source = self._source
+        space = SPACE.match(source, self._cursor)
+
+        if space == None:
+            raise ParseError(self.span(self._cursor, min(self._cursor + 1, len(source))), "Expected whitespace.")
+
+        than_start = space.end()
+        than = self.word(than_start) or source[than_start:than_start + 1]
+
+        if not than.upper() == "THAN":
+            raise ParseError(self.span(than_start, than_start + len(than)), "Expected THAN.")
+
+        self._cursor = than_start + len(than)
+
+        span = self.span(start, self._cursor)
+        span.value = word
+
+        return Operator(span)
+
+class StreamLexer(Lexer):
+    __reader: TextIO
+    __chunk_size: int
+    __offset: int
+    __eof: bool
+
+    def __init__(self, reader: TextIO, file_path: str, chunk_size: int = 1 << 16):
+        super().__init__("", file_path)
+        self.__reader = reader
+        self.__chunk_size = chunk_size
+        self.__offset = 0
+        self.__eof = False
+
+    def span(self, start: int, end: int) -> Span:
+        # Chunks are discarded once consumed, so spans keep their own text.
+        return Span(
+            value=self._source[start:end],
+            file_path=self._file_path,
+            start=self.__offset + start,
+            end=self.__offset + end
+        )
+
+    def read(self):
+        chunk = self.__reader.read(self.__chunk_size)
+
+        if len(chunk) == 0:
+            self.__eof = True
+
+        self.__offset += self._cursor
+        self._source = self._source[self._cursor:] + chunk
+        self._cursor = 0
+
+    def next_token(self) -> Token:
+        while True:
+            start = self._cursor
+
+            try:
+                token = super().next_token()
+                complete = token != None and self._cursor + 1 < len(self._source)
+            except ParseError:
+                if self.__eof: raise
+                complete = False
+
+            # A token touching the end of the buffer may continue in the next chunk.
+            if complete or self.__eof:
+                return token
+
+            self._cursor = start
+            self.read()
+
+def lex(source: str, file_path: str) -> TokenStream:
+    return TokenStream(list(Lexer(source, file_path).tokens()))
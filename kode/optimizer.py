@@ -0,0 +1,315 @@
+from .statements import Assignment, Conditional, Constant, IdentifierStatement, Loop, Operation, Show, Statement, Statements
+from .tokens import OperatorType
+from .runtime import NATIVE_OPERATORS, SHORT_CIRCUITS
+from .frame import UNDEFINED
+from .analysis import constant_value, statement_size
+from .elimination import DeadCodeEliminator
+from .hoisting import InvariantHoister
+from .subexpressions import CommonSubexpressionEliminator
+from .induction import Induction, InductionAnalyzer, find_induction
+from .inference import TypeInference
+from .fusion import UpdateFuser
+from .rewriting import TreeRewriter, rebuild_operation, rebuild_statements
+from typing import Dict
+
+# Larger strings and integers are left to be built at run time, when they are actually reached.
+MAX_FOLDED_SIZE = 4096
+
+FOLDED_TYPES = [str, int, float, bool, type(None)]
+
+# Loops counting a constant counter to a constant bound are copied out for at most this many iterations.
+MAX_UNROLLED_TRIPS = 8
+# Unrolling stops once the copies, including unrolled inner loops, grow past this many nodes.
+MAX_UNROLLED_SIZE = 2048
+
+def folded_size(value: any) -> int:
+    if type(value) == str:
+        return len(value)
+    elif type(value) == int:
+        return value.bit_length()
+
+    return 0
+
+def fold_operation(operator: OperatorType, lhs: any, rhs: any) -> any:
+    native_operator = NATIVE_OPERATORS.get(operator)
+
+    if native_operator == None: return UNDEFINED
+
+    if operator == OperatorType.SHL and type(rhs) == int and rhs > MAX_FOLDED_SIZE:
+        return UNDEFINED
+
+    if operator == OperatorType.TIMES and (type(lhs) == str or type(rhs) == str):
+        text, count = (lhs, rhs) if type(lhs) == str else (rhs, lhs)
+
+        if type(count) in [int, bool] and len(text) * count > MAX_FOLDED_SIZE: return UNDEFINED
+
+    try:
+        value = native_operator(lhs, rhs)
+    except Exception:
+        # Failing operations are kept so they raise their usual error when reached.
+        return UNDEFINED
+
+    if not type(value) in FOLDED_TYPES or folded_size(value) > MAX_FOLDED_SIZE:
+        return UNDEFINED
+
+    return value
+
+class Optimizer(TreeRewriter):
+    __propagate: bool
+    __unroll_limit: int
+    __assignments: Dict[str, int]
+    __constants: Dict[str, any]
+    __eliminator: DeadCodeEliminator
+    __hoister: InvariantHoister
+    __subexpressions: CommonSubexpressionEliminator
+    __induction: InductionAnalyzer
+    __inference: TypeInference
+    __fuser: UpdateFuser
+    __folded: int
+    __propagated: int
+    __unrolled: int
+    __unrolling: int
+
+    def __init__(self, propagate: bool = True, unroll_limit: int = MAX_UNROLLED_TRIPS):
+        self.__propagate = propagate
+        self.__unroll_limit = unroll_limit
+        self.__assignments = {}
+        self.__constants = {}
+        self.__eliminator = DeadCodeEliminator(whole_program=propagate)
+        self.__hoister = InvariantHoister()
+        # Shared values take their temporaries from the hoister, so the two never use the same one.
+        self.__subexpressions = CommonSubexpressionEliminator(self.__hoister.temporary)
+        self.__induction = InductionAnalyzer()
+        self.__inference = TypeInference()
+        self.__fuser = UpdateFuser()
+        self.__folded = 0
+        self.__propagated = 0
+        self.__unrolled = 0
+        self.__unrolling = 0
+
+    @property
+    def statistics(self) -> Dict[str, any]:
+        return {
+            "Folded operations": self.__folded,
+            "Propagated constants": self.__propagated,
+            "Unrolled loops": self.__unrolled,
+            "Dead stores removed": self.__eliminator.stores,
+            "Dead branches removed": self.__eliminator.branches,
+            "Conditionals inverted": self.__eliminator.inverted,
+            "Hoisted invariants": self.__hoister.hoisted,
+            "Shared subexpressions": self.__subexpressions.shared,
+            "Counted loops": self.__induction.counted,
+            "Specialized operations": self.__inference.specialized,
+            "Fused updates": self.__fuser.fused
+        }
+
+    def optimize(self, ast: Statement) -> Statement:
+        ast = self.__eliminator.eliminate(self.fold(ast))
+        # Hoisting runs after folding and elimination, so folded operands and removed stores no longer count as loop inputs.
+        ast = self.__subexpressions.eliminate(self.__hoister.hoist(ast))
+        ast = self.__induction.analyze(ast)
+
+        # Rewrites carry annotations over, but types are inferred last so every operation of the final tree is covered.
+        return self.__fuser.fuse(self.__inference.infer(ast))
+
+    def fold(self, ast: Statement) -> Statement:
+        if not self.__propagate:
+            return self.visit(ast)
+
+        self.count(ast)
+
+        if not type(ast) == Statements:
+            return self.visit(ast)
+
+        statements = []
+
+        # Top-level variables are never popped, so a single constant assignment holds for every later statement.
+        for statement in ast:
+            statement = self.visit_after(statement, statements[-1] if statements else None)
+            self.define(statement)
+            statements.append(statement)
+
+        return rebuild_statements(ast, statements)
+
+    def count(self, statement: Statement):
+        statement_type = type(statement)
+
+        if statement_type == Assignment:
+            name = statement.identifier.value
+            self.__assignments[name] = self.__assignments.get(name, 0) + 1
+            self.count(statement.statements)
+        elif statement_type == Operation:
+            self.count(statement.lhs)
+            self.count(statement.rhs)
+        elif statement_type == Statements:
+            for s in statement: self.count(s)
+        elif statement_type == Show:
+            self.count(statement.statements)
+        elif statement_type == Conditional:
+            self.count(statement.condition)
+            self.count(statement.pass_statement)
+
+            if statement.fail_statement:
+                self.count(statement.fail_statement)
+        elif statement_type == Loop:
+            self.count(statement.condition)
+            self.count(statement.statement)
+
+    def define(self, statement: Statement):
+        if not type(statement) == Assignment: return
+
+        name = statement.identifier.value
+
+        if not self.__assignments.get(name) == 1: return
+
+        value = constant_value(statement.statements)
+
+        if not value is UNDEFINED:
+            self.__constants[name] = value
+
+    def visit_statements(self, statement: Statements) -> Statement:
+        statements = []
+
+        for s in statement:
+            statements.append(self.visit_after(s, statements[-1] if statements else None))
+
+        return rebuild_statements(statement, statements)
+
+    def copies_blocks(self) -> bool:
+        # Scope analysis annotates blocks, so every unrolled copy needs blocks of its own.
+        return self.__unrolling > 0
+
+    def visit_after(self, statement: Statement, previous: Statement) -> Statement:
+        if type(statement) == Loop and type(previous) == Assignment:
+            unrolled = self.unroll(statement, previous)
+
+            if not unrolled == None: return unrolled
+
+        return self.visit(statement)
+
+    def known_value(self, statement: Statement) -> any:
+        if type(statement) == IdentifierStatement:
+            return self.__constants.get(statement.identifier.value, UNDEFINED)
+
+        return constant_value(statement)
+
+    def trips(self, induction: Induction, start: any) -> list:
+        bound = self.known_value(induction.bound)
+
+        if bound is UNDEFINED: return None
+
+        operator = induction.condition.operator_type
+        values = []
+        value = start
+
+        while True:
+            if induction.counter_first:
+                test = fold_operation(operator, value, bound)
+            else:
+                test = fold_operation(operator, bound, value)
+
+            if not type(test) == bool: return None
+
+            if not test: break
+
+            if len(values) == self.__unroll_limit: return None
+
+            values.append(value)
+            value = fold_operation(induction.increment.operator_type, value, induction.step)
+
+            if value is UNDEFINED: return None
+
+        values.append(value)
+
+        return values
+
+    def unroll(self, statement: Loop, previous: Assignment) -> Statement:
+        induction = find_induction(statement)
+
+        if induction == None or not previous.identifier.value == induction.counter.value: return None
+
+        start = constant_value(previous.statements)
+
+        if start is UNDEFINED: return None
+
+        values = self.trips(induction, start)
+
+        # Loops that never run keep their shape, they evaluate to None rather than to the counter.
+        if values == None or len(values) < 2: return None
+
+        name = induction.counter.value
+        counts = (self.__folded, self.__propagated, self.__unrolled)
+        statements = []
+        size = 0
+
+        self.__unrolling += 1
+
+        # Every copy reads the counter as a constant, the body never assigns it.
+        for value, next_value in zip(values, values[1:]):
+            self.__constants[name] = value
+            body = self.visit(induction.body)
+            step = Assignment(
+                span=statement.keyword_span,
+                identifier=induction.counter,
+                statements=Constant(next_value, induction.increment)
+            )
+            size += statement_size(body) + 1
+
+            if size > MAX_UNROLLED_SIZE: break
+
+            statements.extend(body)
+            statements.append(step)
+
+        del self.__constants[name]
+        self.__unrolling -= 1
+
+        if size > MAX_UNROLLED_SIZE:
+            self.__folded, self.__propagated, self.__unrolled = counts
+
+            return None
+
+        self.__unrolled += 1
+
+        # A conditional that always passes keeps the loop's block, so variables first defined in it are still popped.
+        return Conditional(
+            span=statement.keyword_span,
+            condition=Constant(True, statement.condition),
+            pass_statement=Statements(statements),
+            fail_statement=None
+        )
+
+    def visit_identifier(self, statement: IdentifierStatement) -> Statement:
+        value = self.__constants.get(statement.identifier.value, UNDEFINED)
+
+        if value is UNDEFINED: return statement
+
+        self.__propagated += 1
+
+        return Constant(value, statement)
+
+    def visit_operation(self, statement: Operation) -> Statement:
+        lhs = self.visit(statement.lhs)
+        lhs_value = constant_value(lhs)
+
+        # A constant left operand that decides AND or OR is the result, the right operand is never evaluated.
+        if not lhs_value is UNDEFINED and bool(lhs_value) == SHORT_CIRCUITS.get(statement.operator_type):
+            self.__folded += 1
+
+            return Constant(lhs_value, statement)
+
+        rhs = self.visit(statement.rhs)
+        rhs_value = constant_value(rhs)
+
+        if not lhs_value is UNDEFINED and not rhs_value is UNDEFINED:
+            value = fold_operation(statement.operator_type, lhs_value, rhs_value)
+
+            if not value is UNDEFINED:
+                self.__folded += 1
+
+                # The original operation stays the origin, so errors point at the same span.
+                return Constant(value, statement)
+
+        return rebuild_operation(statement, lhs, rhs)
+
+def optimize(ast: Statement, propagate: bool = True, unroll_limit: int = MAX_UNROLLED_TRIPS) -> Statement:
+    return Optimizer(propagate=propagate, unroll_limit=unroll_limit).optimize(ast)
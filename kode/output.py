@@ -0,0 +1,84 @@
+from abc import ABC
+from typing import List, TextIO
+
+class OutputSink(ABC):
+    def write(self, text: str):
+        pass
+
+    def flush(self):
+        pass
+
+    @property
+    def value(self) -> str:
+        return ""
+
+class BufferSink(OutputSink):
+    __chunks: List[str]
+
+    def __init__(self):
+        self.__chunks = []
+
+    def write(self, text: str):
+        self.__chunks.append(text)
+
+    @property
+    def value(self) -> str:
+        if len(self.__chunks) > 1:
+            self.__chunks = ["".join(self.__chunks)]
+
+        return self.__chunks[0] if self.__chunks else ""
+
+class StreamSink(OutputSink):
+    __stream: TextIO
+    __buffer_size: int
+    __chunks: List[str]
+    __size: int
+
+    def __init__(self, stream: TextIO, buffer_size: int = 1 << 16):
+        self.__stream = stream
+        self.__buffer_size = buffer_size
+        self.__chunks = []
+        self.__size = 0
+
+    def write(self, text: str):
+        if self.__buffer_size <= 0:
+            self.__stream.write(text)
+            return
+
+        self.__chunks.append(text)
+        self.__size += len(text)
+
+        if self.__size >= self.__buffer_size:
+            self.flush()
+
+    def flush(self):
+        if len(self.__chunks) > 0:
+            self.__stream.write("".join(self.__chunks))
+            self.__chunks = []
+            self.__size = 0
+
+        self.__stream.flush()
+
+class NullSink(OutputSink):
+    pass
+
+class TeeSink(OutputSink):
+    __sinks: List[OutputSink]
+
+    def __init__(self, *sinks: OutputSink):
+        self.__sinks = list(sinks)
+
+    def write(self, text: str):
+        for sink in self.__sinks:
+            sink.write(text)
+
+    def flush(self):
+        for sink in self.__sinks:
+            sink.flush()
+
+    @property
+    def value(self) -> str:
+        for sink in self.__sinks:
+            if sink.value: return sink.value
+
+        return ""
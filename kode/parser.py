@@ -0,0 +1,217 @@
+from .statements import Assignment, Conditional, IdentifierStatement, Input, LiteralStatement, Loop, Operation, Show, Statement, Statements
+from .tokens import OPERATOR_PRECEDENCE, Identifier, Literal, Operator, Punctuation, Reserved, ReservedType, Token, TokenStream
+from .span import Span
+from .errors import ParseError
+from typing import Callable, Dict, FrozenSet, List
+
+CONDITION_STOPS = frozenset([ReservedType.THEN])
+LOOP_CONDITION_STOPS = frozenset([ReservedType.DO])
+BRANCH_STOPS = frozenset([ReservedType.ELSE, ReservedType.END])
+BODY_STOPS = frozenset([ReservedType.END])
+ELSE_STOPS = frozenset([ReservedType.ELSE])
+PERIOD_STOPS = frozenset([Punctuation])
+
+class Parser:
+    __tokens: List[Token]
+    __cursor: int
+
+    def __init__(self, tokens: TokenStream):
+        self.__tokens = tokens.tokens
+        self.__cursor = tokens.offset
+
+    def peek(self) -> Token:
+        if self.__cursor >= len(self.__tokens): return None
+
+        return self.__tokens[self.__cursor]
+
+    def pop(self) -> Token:
+        token = self.__tokens[self.__cursor]
+
+        self.__cursor += 1
+
+        return token
+
+    def matches(self, token: Token, kinds: FrozenSet) -> bool:
+        if token == None: return False
+
+        token_type = type(token)
+
+        if token_type in kinds: return True
+
+        return token_type == Reserved and token.enum_type in kinds
+
+    def at(self, stops: FrozenSet) -> bool:
+        token = self.peek()
+
+        return token == None or self.matches(token, stops)
+
+    def error_span(self) -> Span:
+        token = self.peek()
+
+        if not token == None:
+            return token.span
+        elif self.__cursor > 0:
+            return self.__tokens[self.__cursor - 1].span
+
+        return Span(value="", file_path=None, start=0, end=0)
+
+    def expect(self, kind: any, message: str, span: Span = None) -> Token:
+        if not self.matches(self.peek(), frozenset([kind])):
+            raise ParseError(span if span else self.error_span(), message)
+
+        return self.pop()
+
+    def owns_period(self, stops: FrozenSet) -> bool:
+        # Nested SET and SHOW statements share the period closing the outermost one.
+        return type(self.peek()) == Punctuation and not Punctuation in stops
+
+    def parse(self) -> Statement:
+        return self.parse_statements(frozenset())
+
+    def parse_statements(self, stops: FrozenSet) -> Statement:
+        statements = []
+
+        while not self.at(stops):
+            statements.append(self.parse_statement(stops))
+
+        if len(statements) == 1:
+            return statements[0]
+
+        return Statements(statements)
+
+    def parse_statement(self, stops: FrozenSet) -> Statement:
+        token = self.peek()
+        token_type = type(token)
+
+        if token_type == Reserved and token.enum_type in RESERVED_PARSERS:
+            return RESERVED_PARSERS[token.enum_type](self, stops)
+
+        if token_type == Literal or token_type == Identifier or token_type == Operator:
+            statement = self.parse_expression(0)
+
+            # Operations extend to the end of their enclosing statement.
+            if self.at(stops):
+                return statement
+
+        raise ParseError(self.error_span(), "Could not match any statement to tokens.")
+
+    def parse_operand(self) -> Statement:
+        token = self.peek()
+        token_type = type(token)
+
+        if token_type == Literal:
+            # Malformed literals are rejected at parse time.
+            token.validate()
+
+            return LiteralStatement(self.pop())
+        elif token_type == Identifier:
+            return IdentifierStatement(self.pop())
+        elif token_type == Reserved and token.enum_type == ReservedType.INPUT:
+            return Input(self.pop().span)
+
+        raise ParseError(self.error_span(), "Expected operand.")
+
+    def parse_expression(self, min_precedence: int) -> Statement:
+        lhs = self.parse_operand()
+
+        while True:
+            token = self.peek()
+
+            if not type(token) == Operator: return lhs
+
+            precedence = OPERATOR_PRECEDENCE[token.enum_type]
+
+            if precedence < min_precedence: return lhs
+
+            self.__cursor += 1
+            rhs = self.parse_expression(precedence + 1)
+            lhs = Operation(lhs, token, rhs)
+
+    def parse_assignment(self, stops: FrozenSet) -> Assignment:
+        set_token = self.pop()
+        identifier = self.expect(Identifier, "Expected identifier.")
+        to_token = self.expect(ReservedType.TO, "Expected TO.")
+        statements = self.parse_statements(stops | PERIOD_STOPS)
+
+        if self.owns_period(stops): self.pop()
+
+        return Assignment(
+            span=set_token.span + to_token.span,
+            identifier=identifier,
+            statements=statements
+        )
+
+    def parse_show(self, stops: FrozenSet) -> Show:
+        show = self.pop()
+        statements = self.parse_statements(stops | PERIOD_STOPS)
+
+        if self.owns_period(stops): self.pop()
+
+        return Show(show.span, statements)
+
+    def parse_input(self, stops: FrozenSet) -> Statement:
+        # INPUT is an operand, but a lone INPUT may still be followed by another statement.
+        statement = self.parse_expression(0)
+
+        if type(statement) == Input or self.at(stops):
+            return statement
+
+        raise ParseError(self.error_span(), "Could not match any statement to tokens.")
+
+    def parse_conditional(self, stops: FrozenSet) -> Conditional:
+        if_token = self.pop()
+        condition = self.parse_statements(CONDITION_STOPS)
+        then_token = self.expect(ReservedType.THEN, "Expected THEN.")
+        pass_statement = self.parse_statements(BRANCH_STOPS)
+
+        else_token = None
+        fail_statement = None
+
+        if self.matches(self.peek(), ELSE_STOPS):
+            else_token = self.pop()
+            fail_start = self.__cursor
+            fail_statement = self.parse_statements(BRANCH_STOPS)
+
+            if self.__cursor == fail_start:
+                fail_statement = None
+
+            if self.matches(self.peek(), ELSE_STOPS):
+                raise ParseError(self.peek().span, "Too many else.")
+
+        end_token = self.expect(ReservedType.END, "Conditional statement is not closed.", if_token.span + self.error_span())
+
+        span = if_token.span + then_token.span + end_token.span
+
+        if else_token:
+            span += else_token.span
+
+        return Conditional(
+            span=span,
+            condition=condition,
+            pass_statement=pass_statement,
+            fail_statement=fail_statement
+        )
+
+    def parse_loop(self, stops: FrozenSet) -> Loop:
+        while_token = self.pop()
+        condition = self.parse_statements(LOOP_CONDITION_STOPS)
+        do_token = self.expect(ReservedType.DO, "Expected DO.")
+        statement = self.parse_statements(BODY_STOPS)
+        end_token = self.expect(ReservedType.END, "Unable to parse loop statement.", while_token.span)
+
+        return Loop(
+            span=while_token.span + do_token.span + end_token.span,
+            condition=condition,
+            statement=statement
+        )
+
+RESERVED_PARSERS: Dict[ReservedType, Callable[[Parser, FrozenSet], Statement]] = {
+    ReservedType.IF: Parser.parse_conditional,
+    ReservedType.WHILE: Parser.parse_loop,
+    ReservedType.SHOW: Parser.parse_show,
+    ReservedType.SET: Parser.parse_assignment,
+    ReservedType.INPUT: Parser.parse_input,
+}
+
+def parse_tokens(tokens: TokenStream) -> Statement:
+    return Parser(tokens).parse()
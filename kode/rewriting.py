@@ -0,0 +1,122 @@
+from .statements import Assignment, Conditional, IdentifierStatement, Loop, Operation, Show, Statement, Statements
+from typing import Callable, Dict, List
+
+def rebuild(old: Statement, new: Statement) -> Statement:
+    # Annotations on the values of a node carry over, the ones pointing into its old children are derived again from the new ones.
+    new_type = type(new)
+
+    if new_type == Operation:
+        new.operand_types = old.operand_types
+    elif new_type == Assignment:
+        # Update fusion builds on the rewriting passes, so it is only imported once an assignment is rebuilt.
+        from .fusion import find_update
+
+        if not old.update == None: new.update = find_update(new)
+    elif new_type == Conditional:
+        new.scoped = old.scoped
+        new.negated = old.negated
+    elif new_type == Loop:
+        # Loop analysis builds on the rewriting passes, so it is only imported once a loop is rebuilt.
+        from .induction import find_induction
+
+        new.scoped = old.scoped
+        new.invariants = old.invariants
+
+        if not old.induction == None: new.induction = find_induction(new)
+
+    return new
+
+def rebuild_statements(statement: Statements, statements: List[Statement]) -> Statement:
+    if len(statements) == len(list(statement)) and all(new is old for new, old in zip(statements, statement)):
+        return statement
+
+    return Statements(statements)
+
+def rebuild_assignment(statement: Assignment, statements: Statement, force: bool = False) -> Statement:
+    if not force and statements is statement.statements: return statement
+
+    return rebuild(statement, Assignment(
+        span=statement.keyword_span,
+        identifier=statement.identifier,
+        statements=statements
+    ))
+
+def rebuild_show(statement: Show, statements: Statement) -> Statement:
+    if statements is statement.statements: return statement
+
+    return Show(statement.keyword_span, statements)
+
+def rebuild_operation(statement: Operation, lhs: Statement, rhs: Statement, force: bool = False) -> Statement:
+    if not force and lhs is statement.lhs and rhs is statement.rhs: return statement
+
+    return rebuild(statement, Operation(lhs, statement.operator, rhs))
+
+def rebuild_conditional(statement: Conditional, condition: Statement, pass_statement: Statement, fail_statement: Statement, force: bool = False) -> Statement:
+    if not force and condition is statement.condition and pass_statement is statement.pass_statement and fail_statement is statement.fail_statement:
+        return statement
+
+    return rebuild(statement, Conditional(
+        span=statement.keyword_span,
+        condition=condition,
+        pass_statement=pass_statement,
+        fail_statement=fail_statement
+    ))
+
+def rebuild_loop(statement: Loop, condition: Statement, body: Statement, force: bool = False) -> Statement:
+    if not force and condition is statement.condition and body is statement.statement: return statement
+
+    return rebuild(statement, Loop(
+        span=statement.keyword_span,
+        condition=condition,
+        statement=body
+    ))
+
+class TreeRewriter:
+    def visit(self, statement: Statement) -> Statement:
+        visit_method = STATEMENT_REWRITERS.get(type(statement))
+
+        if visit_method == None: return statement
+
+        return visit_method(self, statement)
+
+    def copies_blocks(self) -> bool:
+        return False
+
+    def visit_statements(self, statement: Statements) -> Statement:
+        return rebuild_statements(statement, [self.visit(s) for s in statement])
+
+    def visit_assignment(self, statement: Assignment) -> Statement:
+        return rebuild_assignment(statement, self.visit(statement.statements))
+
+    def visit_show(self, statement: Show) -> Statement:
+        return rebuild_show(statement, self.visit(statement.statements))
+
+    def visit_operation(self, statement: Operation) -> Statement:
+        return rebuild_operation(statement, self.visit(statement.lhs), self.visit(statement.rhs))
+
+    def visit_identifier(self, statement: IdentifierStatement) -> Statement:
+        return statement
+
+    def visit_conditional(self, statement: Conditional) -> Statement:
+        condition = self.visit(statement.condition)
+        pass_statement = self.visit(statement.pass_statement)
+        fail_statement = self.visit(statement.fail_statement) if statement.fail_statement else None
+
+        return rebuild_conditional(statement, condition, pass_statement, fail_statement, force=self.copies_blocks())
+
+    def visit_loop(self, statement: Loop) -> Statement:
+        condition = self.visit(statement.condition)
+        body = self.visit(statement.statement)
+
+        return rebuild_loop(statement, condition, body, force=self.copies_blocks())
+
+# Passes override the visit methods, so the table calls them through the rewriter instead of binding the base ones.
+STATEMENT_REWRITERS: Dict[type, Callable[[TreeRewriter, Statement], Statement]] = {
+    Statements: lambda rewriter, statement: rewriter.visit_statements(statement),
+    Conditional: lambda rewriter, statement: rewriter.visit_conditional(statement),
+    Loop: lambda rewriter, statement: rewriter.visit_loop(statement),
+    Assignment: lambda rewriter, statement: rewriter.visit_assignment(statement),
+    Operation: lambda rewriter, statement: rewriter.visit_operation(statement),
+    Show: lambda rewriter, statement: rewriter.visit_show(statement),
+    IdentifierStatement: lambda rewriter, statement: rewriter.visit_identifier(statement)
+}
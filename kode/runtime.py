@@ -0,0 +1,231 @@
+from .statements import Common, Constant, Invariant, Operation, Statement, Statements
+from .tokens import Literal, LiteralType, OperatorType, isint
+from .span import Span
+from .errors import InterpreterError
+from typing import Callable, Dict, List, Tuple
+import operator
+
+class OperandError(Exception):
+    operand: int
+
+    def __init__(self, operand: int, message: str):
+        self.operand = operand
+        super().__init__(message)
+
+def literal_type(value: any) -> LiteralType:
+    value_type = type(value)
+
+    if value_type == str:
+        return LiteralType.STRING
+    elif value_type == bool:
+        return LiteralType.BOOLEAN
+    elif value_type == int:
+        return LiteralType.INTEGER
+    elif value_type == float:
+        return LiteralType.FLOAT
+    elif value == None:
+        return LiteralType.NONE
+    else:
+        raise Exception(f"Unimplemented value type `{value_type}`.")
+
+def get_literal(value: any, spanned_objects: list):
+    if type(value) == Literal: raise RuntimeError("Passing a literal.")
+    if type(value) == str: value = '"' + value + '"'
+
+    spans: List[Span] = []
+
+    for so in spanned_objects:
+        if type(so) == Span:
+            spans.append(so)
+        else:
+            spans.append(so.span)
+
+    starts = [span.start for span in spans]
+    ends = [span.end for span in spans]
+
+    return Literal(
+        Span(
+            value=str(value),
+            file_path=spans[0].file_path,
+            start=min(starts),
+            end=max(ends)
+        )
+    )
+
+def result_span(statement: Statement) -> Span:
+    if type(statement) == Statements:
+        statements = list(statement)
+
+        if len(statements) == 0:
+            return Span(value="", file_path=None, start=0, end=0)
+
+        return result_span(statements[-1])
+    elif type(statement) == Operation:
+        return result_span(statement.lhs) + result_span(statement.rhs)
+    elif type(statement) == Constant:
+        # Folded values report the span of the expression they replaced.
+        return result_span(statement.origin)
+    elif type(statement) == Invariant or type(statement) == Common:
+        return result_span(statement.statement)
+    else:
+        return statement.span
+
+class Value:
+    __slots__ = ("enum_type", "value", "origin")
+
+    enum_type: LiteralType
+    value: any
+    origin: Statement
+
+    def __init__(self, enum_type: LiteralType, value: any, origin: Statement):
+        self.enum_type = enum_type
+        self.value = value
+        self.origin = origin
+
+    @classmethod
+    def of(cls, value: any, origin: Statement) -> 'Value':
+        return Value(literal_type(value), value, origin)
+
+    @property
+    def span(self) -> Span:
+        return result_span(self.origin)
+
+    @property
+    def literal(self) -> Literal:
+        return get_literal(self.value, spanned_objects=[self.span])
+
+    def with_origin(self, origin: Statement) -> 'Value':
+        return Value(self.enum_type, self.value, origin)
+
+    def __str__(self) -> str:
+        return f"Value({self.value},{self.enum_type})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+def parse_input(value: str, span: Span) -> any:
+    if not value:
+        return None
+    elif value.isalpha():
+        return value
+    elif isint(value):
+        return int(value)
+
+    return Literal(Span(
+        value=value,
+        file_path=span.file_path,
+        start=span.start,
+        end=span.end
+    )).value
+
+def native_plus(lhs: any, rhs: any) -> any:
+    lhs_type = type(lhs)
+
+    if lhs_type == str:
+        return lhs + str(rhs)
+    elif lhs_type == float:
+        return lhs + float(rhs)
+    elif lhs_type == int:
+        return lhs + int(rhs)
+    else:
+        return lhs + rhs
+
+def native_equals(lhs: any, rhs: any) -> bool:
+    if lhs == None and rhs == None:
+        return True
+
+    return lhs == rhs
+
+def native_and(lhs: any, rhs: any) -> any:
+    return lhs and rhs
+
+def native_or(lhs: any, rhs: any) -> any:
+    return lhs or rhs
+
+def native_index(lhs: any, rhs: any) -> any:
+    if not type(lhs) == str:
+        raise OperandError(0, f"Cannot index {literal_type(lhs)}.")
+
+    if not type(rhs) == int:
+        raise OperandError(1, f"Cannot index with {literal_type(rhs)}.")
+
+    return lhs[rhs]
+
+NATIVE_OPERATORS: Dict[OperatorType, Callable[[any, any], any]] = {
+    OperatorType.PLUS: native_plus,
+    OperatorType.MINUS: operator.sub,
+    OperatorType.TIMES: operator.mul,
+    OperatorType.DIVIDE: operator.floordiv,
+    OperatorType.MOD: operator.mod,
+    OperatorType.EQUALS: native_equals,
+    OperatorType.GREATER: operator.gt,
+    OperatorType.LESS: operator.lt,
+    OperatorType.AND: native_and,
+    OperatorType.OR: native_or,
+    OperatorType.XOR: operator.xor,
+    OperatorType.BAND: operator.and_,
+    OperatorType.BOR: operator.or_,
+    OperatorType.SHL: operator.lshift,
+    OperatorType.SHR: operator.rshift,
+    OperatorType.INDEX: native_index
+}
+
+# AND is decided by a false left operand and OR by a true one, the right operand is then never evaluated.
+SHORT_CIRCUITS: Dict[OperatorType, bool] = {
+    OperatorType.AND: False,
+    OperatorType.OR: True
+}
+
+SKIPPED_NAMES: Dict[OperatorType, str] = {
+    OperatorType.AND: "Skipped AND operands",
+    OperatorType.OR: "Skipped OR operands"
+}
+
+# Operand types proven by type inference let these run without the checks of the native operators.
+SPECIALIZED_OPERATORS: Dict[Tuple[OperatorType, LiteralType, LiteralType], Tuple[Callable[[any, any], any], LiteralType]] = {
+    (OperatorType.PLUS, LiteralType.INTEGER, LiteralType.INTEGER): (operator.add, LiteralType.INTEGER),
+    (OperatorType.MINUS, LiteralType.INTEGER, LiteralType.INTEGER): (operator.sub, LiteralType.INTEGER),
+    (OperatorType.TIMES, LiteralType.INTEGER, LiteralType.INTEGER): (operator.mul, LiteralType.INTEGER),
+    (OperatorType.DIVIDE, LiteralType.INTEGER, LiteralType.INTEGER): (operator.floordiv, LiteralType.INTEGER),
+    (OperatorType.MOD, LiteralType.INTEGER, LiteralType.INTEGER): (operator.mod, LiteralType.INTEGER),
+    (OperatorType.EQUALS, LiteralType.INTEGER, LiteralType.INTEGER): (operator.eq, LiteralType.BOOLEAN),
+    (OperatorType.GREATER, LiteralType.INTEGER, LiteralType.INTEGER): (operator.gt, LiteralType.BOOLEAN),
+    (OperatorType.LESS, LiteralType.INTEGER, LiteralType.INTEGER): (operator.lt, LiteralType.BOOLEAN),
+    (OperatorType.XOR, LiteralType.INTEGER, LiteralType.INTEGER): (operator.xor, LiteralType.INTEGER),
+    (OperatorType.BAND, LiteralType.INTEGER, LiteralType.INTEGER): (operator.and_, LiteralType.INTEGER),
+    (OperatorType.BOR, LiteralType.INTEGER, LiteralType.INTEGER): (operator.or_, LiteralType.INTEGER),
+    (OperatorType.SHL, LiteralType.INTEGER, LiteralType.INTEGER): (operator.lshift, LiteralType.INTEGER),
+    (OperatorType.SHR, LiteralType.INTEGER, LiteralType.INTEGER): (operator.rshift, LiteralType.INTEGER),
+    (OperatorType.EQUALS, LiteralType.BOOLEAN, LiteralType.BOOLEAN): (operator.eq, LiteralType.BOOLEAN),
+    (OperatorType.AND, LiteralType.BOOLEAN, LiteralType.BOOLEAN): (operator.and_, LiteralType.BOOLEAN),
+    (OperatorType.OR, LiteralType.BOOLEAN, LiteralType.BOOLEAN): (operator.or_, LiteralType.BOOLEAN),
+    (OperatorType.XOR, LiteralType.BOOLEAN, LiteralType.BOOLEAN): (operator.xor, LiteralType.BOOLEAN),
+    (OperatorType.BAND, LiteralType.BOOLEAN, LiteralType.BOOLEAN): (operator.and_, LiteralType.BOOLEAN),
+    (OperatorType.BOR, LiteralType.BOOLEAN, LiteralType.BOOLEAN): (operator.or_, LiteralType.BOOLEAN),
+    (OperatorType.PLUS, LiteralType.STRING, LiteralType.STRING): (operator.add, LiteralType.STRING),
+    (OperatorType.EQUALS, LiteralType.STRING, LiteralType.STRING): (operator.eq, LiteralType.BOOLEAN),
+    (OperatorType.GREATER, LiteralType.STRING, LiteralType.STRING): (operator.gt, LiteralType.BOOLEAN),
+    (OperatorType.LESS, LiteralType.STRING, LiteralType.STRING): (operator.lt, LiteralType.BOOLEAN),
+    (OperatorType.INDEX, LiteralType.STRING, LiteralType.INTEGER): (operator.getitem, LiteralType.STRING)
+}
+
+def operator_function(statement: Operation) -> Callable[[any, any], any]:
+    if statement.operand_types == None:
+        return NATIVE_OPERATORS[statement.operator_type]
+
+    return SPECIALIZED_OPERATORS[(statement.operator_type, *statement.operand_types)][0]
+
+def checked_operator_function(statement: Operation) -> Callable[[any, any], any]:
+    function = operator_function(statement)
+
+    if not statement.operand_types == None: return function
+
+    def checked(lhs: any, rhs: any) -> any:
+        try:
+            return function(lhs, rhs)
+        except OperandError as err:
+            operand = statement.rhs if err.operand else statement.lhs
+
+            raise InterpreterError(result_span(operand), str(err))
+
+    return checked
@@ -1,17 +1,31 @@
 from typing import List
 
 class Span:
+    __slots__ = ("__start", "__end", "__value", "__source", "__file_path")
+
     __start: int
     __end: int
     __value: str
+    __source: str
     __file_path: str
 
-    def __init__(self, value: str, file_path: str, start: int, end: int):
+    def __init__(self, value: str, file_path: str, start: int, end: int, source: str = None):
         self.__value = value
+        self.__source = source
         self.__file_path = file_path
         self.__start = start
         self.__end = end
 
+    @classmethod
+    def of(cls, source: str, file_path: str) -> 'Span':
+        return Span(
+            value=None,
+            file_path=file_path,
+            start=0,
+            end=len(source),
+            source=source
+        )
+
     @property
     def start(self):
         return self.__start
@@ -22,29 +36,41 @@ class Span:
 
     @property
     def value(self):
+        if self.__value == None:
+            self.__value = self.__source[self.__start:self.__end]
+
         return self.__value
 
     @value.setter
     def value(self, v: str):
         self.__value = v
 
+    @property
+    def source(self) -> str:
+        return self.__source
+
     @property
     def file_path(self):
         return self.__file_path
 
     def pop(self, size: int = 1) -> 'Span':
         if size < 0: raise Exception("Cannot pop negative value.")
-        if size > len(self.__value): raise Exception(f"Trying to pop greater than size.")
+        if size > len(self): raise Exception(f"Trying to pop greater than size.")
 
         pop_offset = self.__start
         self.__start += size
-        pop_value, self.__value = self.__value[:size], self.__value[size:]
+
+        if self.__source == None:
+            pop_value, self.__value = self.__value[:size], self.__value[size:]
+        else:
+            pop_value, self.__value = None, None
 
         return Span(
-            value=pop_value, 
+            value=pop_value,
             file_path=self.__file_path,
             start=pop_offset,
-            end=pop_offset + size
+            end=pop_offset + size,
+            source=self.__source
         )
 
     def __add__(self, other: 'Span'):
@@ -53,6 +79,15 @@ class Span:
         new_start = min(self.start, other.start)
         new_end = max(self.end, other.end)
 
+        if self.__source != None and self.__source is other.__source:
+            return Span(
+                value=None,
+                file_path=self.__file_path if self.__file_path else other.file_path,
+                start=new_start,
+                end=new_end,
+                source=self.__source
+            )
+
         new_size = len(self) + len(other) + abs(self.start - other.start)
         new_value = [" "] * new_size
 
@@ -65,14 +100,14 @@ class Span:
         value = "".join(new_value).strip()
 
         return Span(
-            value=value, 
+            value=value,
             file_path=self.__file_path if self.__file_path else other.file_path,
             start=new_start,
-            end=new_end    
+            end=new_end
         )
 
     def __iter__(self):
-        return self.__value.__iter__()
+        return self.value.__iter__()
 
     def __str__(self) -> str:
         return f"Span({self.value},{self.start}-{self.end})"
@@ -81,30 +116,30 @@ class Span:
         return str(self)
 
     def __len__(self) -> int:
+        if self.__value == None:
+            return self.__end - self.__start
+
         return len(self.__value)
 
 def spanize(source: str, file_path: str) -> List[Span]:
     from .tokens import PunctuationType
 
-    source = Span(
-        value=source, 
-        file_path=file_path,
-        start=0,
-        end=len(source)
-    )
+    punctuations = [p.value for p in PunctuationType]
+    text = source
+    source = Span.of(text, file_path)
 
     spans = []
 
     i = 0
-    is_space = source.value[0].isspace()
+    is_space = text[0].isspace()
     while i < len(source):
-        c = source.value[i]
+        c = text[source.start + i]
 
-        if c in [p.value for p in PunctuationType]:
+        if c in punctuations:
             spans.append(source.pop(i))
             spans.append(source.pop())
-            if len(source.value) > 0:
-                is_space = source.value[0].isspace()
+            if len(source) > 0:
+                is_space = text[source.start].isspace()
             else:
                 is_space = False
             i = 0
@@ -1,11 +1,14 @@
 from abc import ABC
-from typing import List
+from typing import Iterator, List, Tuple
 
 from kode.span import Span
-from .tokens import END_BOUNDED_RESERVES, OPERATOR_PRECEDENCE, Operator, PunctuationType, Token, TokenStream, ReservedType, Identifier, Punctuation, Literal
+from .tokens import END_BOUNDED_RESERVES, OPERATOR_PRECEDENCE, Operator, OperatorType, PunctuationType, Token, TokenStream, Reserved, ReservedType, Identifier, Punctuation, Literal, LiteralType
 from .errors import ParseError
 
 class Statement(ABC):
+    # Interpreter-specific handler resolved once per node and cached here.
+    handler: any = None
+
     @property
     def span(self):
         return None
@@ -96,6 +99,9 @@ class IdentifierStatement(Statement):
         return IdentifierStatement(tokens.pop())
 
 class Assignment(Statement):
+    # Set by the optimizer when the value only combines the variable itself with one more operand.
+    update: any = None
+
     __span: Span
     __identifier: Identifier
     __statements: Statements
@@ -109,6 +115,10 @@ class Assignment(Statement):
     def span(self):
         return self.__span + self.__identifier.span + self.__statements.span
 
+    @property
+    def keyword_span(self) -> Span:
+        return self.__span
+
     @property
     def statements(self) -> Statements:
         return self.__statements
@@ -143,13 +153,18 @@ class Assignment(Statement):
         )
 
 class Operation(Statement):
+    # Set by type inference when both operand types are proven and a specialized operator exists.
+    operand_types: Tuple[LiteralType, LiteralType] = None
+
     __lhs: Statement
     __operator: Operator
+    __operator_type: OperatorType
     __rhs: Statement
 
     def __init__(self, lhs: Statement, operator: Operator, rhs: Statement):
         self.__lhs = lhs
         self.__operator = operator
+        self.__operator_type = operator.enum_type
         self.__rhs = rhs
 
     @property
@@ -164,6 +179,10 @@ class Operation(Statement):
     def operator(self):
         return self.__operator
 
+    @property
+    def operator_type(self) -> OperatorType:
+        return self.__operator_type
+
     @property
     def rhs(self):
         return self.__rhs
@@ -218,6 +237,10 @@ class Show(Statement):
     def span(self):
         return self.__span + self.__statements.span
 
+    @property
+    def keyword_span(self) -> Span:
+        return self.__span
+
     def __str__(self) -> str:
         return f"Show({self.__statements})"
 
@@ -264,7 +287,90 @@ class Input(Statement):
 
         return Input(input_token.span)
 
+class Constant(Statement):
+    __value: any
+    __origin: Statement
+
+    def __init__(self, value: any, origin: Statement):
+        self.__value = value
+        self.__origin = origin
+
+    @property
+    def span(self):
+        return self.__origin.span
+
+    @property
+    def value(self) -> any:
+        return self.__value
+
+    @property
+    def origin(self) -> Statement:
+        return self.__origin
+
+    def __str__(self) -> str:
+        return f"Constant({self.__value!r})"
+
+class Invariant(Statement):
+    __statement: Statement
+    __index: int
+
+    def __init__(self, statement: Statement, index: int):
+        self.__statement = statement
+        self.__index = index
+
+    @property
+    def span(self):
+        return self.__statement.span
+
+    @property
+    def statement(self) -> Statement:
+        return self.__statement
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    def __str__(self) -> str:
+        return f"Invariant({self.__index},{self.__statement})"
+
+class Common(Statement):
+    __statement: Statement
+    __index: int
+    __first: bool
+
+    def __init__(self, statement: Statement, index: int, first: bool):
+        self.__statement = statement
+        self.__index = index
+        self.__first = first
+
+    @property
+    def span(self):
+        return self.__statement.span
+
+    @property
+    def statement(self) -> Statement:
+        return self.__statement
+
+    @property
+    def index(self) -> int:
+        return self.__index
+
+    @property
+    def first(self) -> bool:
+        return self.__first
+
+    def __str__(self) -> str:
+        if self.__first:
+            return f"Common({self.__index},{self.__statement})"
+
+        return f"Common({self.__index})"
+
 class Conditional(Statement):
+    # Cleared by scope analysis when the block never defines a new variable.
+    scoped: bool = True
+    # Set by the optimizer when an empty THEN was dropped, the remaining branch runs on FALSE.
+    negated: bool = False
+
     __span: Span
     __condition: Statement
     __pass_statement: Statement
@@ -285,6 +391,10 @@ class Conditional(Statement):
 
         return span
 
+    @property
+    def keyword_span(self) -> Span:
+        return self.__span
+
     @property
     def condition(self):
         return self.__condition
@@ -368,6 +478,12 @@ class Conditional(Statement):
         )
 
 class Loop(Statement):
+    scoped: bool = True
+    # Temporaries of the invariants hoisted to this loop, reset every time it is entered.
+    invariants: Tuple[int, ...] = ()
+    # Set by loop analysis when the loop only counts a variable towards an invariant bound.
+    induction: any = None
+
     __span: Span
     __condition: Statement
     __statement: Statement
@@ -381,6 +497,10 @@ class Loop(Statement):
     def span(self):
         return self.__span + self.__condition.span + self.__statement.span
 
+    @property
+    def keyword_span(self) -> Span:
+        return self.__span
+
     @property
     def condition(self):
         return self.__condition
@@ -467,3 +587,37 @@ def statementize(tokens: TokenStream) -> Statements:
         return statements[0]
     else:
         return Statements(statements)
+
+def statementize_stream(tokens: Iterator[Token]) -> Iterator[Statement]:
+    from .parser import parse_tokens
+
+    pending: List[Token] = []
+    end_count = 0
+
+    for token in tokens:
+        pending.append(token)
+        head = pending[0]
+        complete = False
+
+        if not type(head) == Reserved:
+            # Bare operations extend to the end of the stream.
+            continue
+
+        if type(token) == Reserved and token.enum_type in END_BOUNDED_RESERVES:
+            end_count += 1
+        elif type(token) == Reserved and token.enum_type == ReservedType.END:
+            end_count -= 1
+
+        if head.enum_type in END_BOUNDED_RESERVES:
+            complete = end_count == 0
+        elif head.enum_type in [ReservedType.SET, ReservedType.SHOW, ReservedType.INPUT]:
+            # INPUT is an operand, so a statement headed by it may continue into an operation.
+            complete = end_count == 0 and type(token) == Punctuation
+
+        if complete:
+            yield parse_tokens(TokenStream(pending))
+            pending = []
+            end_count = 0
+
+    if len(pending) > 0:
+        yield parse_tokens(TokenStream(pending))
@@ -0,0 +1,153 @@
+from .statements import Assignment, Common, Conditional, Constant, IdentifierStatement, Invariant, LiteralStatement, Loop, Operation, Statement
+from .analysis import assigned_names, constant_value, read_names
+from .runtime import SHORT_CIRCUITS
+from .frame import UNDEFINED
+from .rewriting import TreeRewriter, rebuild_assignment, rebuild_conditional, rebuild_loop, rebuild_operation
+from typing import Callable, Dict, FrozenSet, List, Tuple
+
+class CommonSubexpressionEliminator(TreeRewriter):
+    __temporary: Callable[[], int]
+    __numbers: Dict[tuple, int]
+    __available: Dict[int, Tuple[int, FrozenSet[str]]]
+    __occurrences: List[int]
+    __indexes: Dict[int, int]
+    __shared: int
+
+    def __init__(self, temporary: Callable[[], int]):
+        self.__temporary = temporary
+        self.__numbers = {}
+        self.__available = {}
+        self.__occurrences = []
+        self.__indexes = {}
+        self.__shared = 0
+
+    @property
+    def shared(self) -> int:
+        return self.__shared
+
+    def eliminate(self, ast: Statement) -> Statement:
+        # The first walk counts how often every value is computed, the second one walks the same way and shares repeated values.
+        self.__available = {}
+        self.__occurrences = []
+        self.__indexes = {}
+        self.visit(ast)
+
+        for group, occurrences in enumerate(self.__occurrences):
+            if occurrences > 1:
+                self.__indexes[group] = self.__temporary()
+                self.__shared += occurrences - 1
+
+        if len(self.__indexes) == 0: return ast
+
+        self.__available = {}
+        self.__occurrences = []
+
+        return self.visit(ast)
+
+    def number(self, statement: Statement) -> int:
+        statement_type = type(statement)
+
+        if statement_type == IdentifierStatement:
+            key = ("name", statement.identifier.value)
+        elif statement_type == LiteralStatement or statement_type == Constant:
+            value = constant_value(statement)
+
+            if value is UNDEFINED: return None
+
+            # Equal values of different types or signs, like 1 and TRUE or 0.0 and -0.0, do not behave the same.
+            key = ("value", type(value), repr(value))
+        elif statement_type == Invariant:
+            key = ("invariant", statement.index)
+        elif statement_type == Operation:
+            lhs = self.number(statement.lhs)
+            rhs = self.number(statement.rhs)
+
+            if lhs == None or rhs == None: return None
+
+            key = (statement.operator_type, lhs, rhs)
+        else:
+            return None
+
+        number = self.__numbers.get(key)
+
+        if number == None:
+            number = len(self.__numbers)
+            self.__numbers[key] = number
+
+        return number
+
+    def invalidate(self, names: FrozenSet[str]):
+        if len(names) == 0: return
+
+        self.__available = {number: (group, reads) for number, (group, reads) in self.__available.items() if not reads & names}
+
+    def share(self, statement: Operation, group: int, first: bool) -> Statement:
+        index = self.__indexes.get(group)
+
+        if index == None: return statement
+
+        return Common(statement, index, first)
+
+    def visit_operation(self, statement: Operation) -> Statement:
+        number = self.number(statement)
+        available = self.__available.get(number) if not number == None else None
+
+        # A repeated value is read back, so its operands are not evaluated again.
+        if not available == None:
+            group, _ = available
+            self.__occurrences[group] += 1
+
+            return self.share(statement, group, False)
+
+        lhs = self.visit(statement.lhs)
+
+        if statement.operator_type in SHORT_CIRCUITS:
+            # The right operand of AND and OR may be skipped, so values computed in it are not available after it.
+            available = self.__available
+            self.__available = dict(available)
+            rhs = self.visit(statement.rhs)
+            self.__available = available
+        else:
+            rhs = self.visit(statement.rhs)
+
+        operation = rebuild_operation(statement, lhs, rhs)
+
+        if number == None: return operation
+
+        group = len(self.__occurrences)
+        self.__occurrences.append(1)
+        self.__available[number] = (group, frozenset(read_names(statement)))
+
+        return self.share(operation, group, True)
+
+    def visit_assignment(self, statement: Assignment) -> Statement:
+        statements = self.visit(statement.statements)
+        self.invalidate(frozenset([statement.identifier.value]))
+
+        return rebuild_assignment(statement, statements)
+
+    def visit_conditional(self, statement: Conditional) -> Statement:
+        condition = self.visit(statement.condition)
+        available = self.__available
+
+        # Values computed in a branch may not exist after it, values from before the branch hold in it until overwritten.
+        self.__available = dict(available)
+        pass_statement = self.visit(statement.pass_statement)
+        self.__available = dict(available)
+        fail_statement = self.visit(statement.fail_statement) if statement.fail_statement else None
+        self.__available = available
+        self.invalidate(frozenset(assigned_names(statement)))
+
+        return rebuild_conditional(statement, condition, pass_statement, fail_statement)
+
+    def visit_loop(self, statement: Loop) -> Statement:
+        # The condition runs again after the body, so only values the loop never changes come in from before it.
+        self.invalidate(frozenset(assigned_names(statement)))
+        available = self.__available
+
+        self.__available = dict(available)
+        condition = self.visit(statement.condition)
+        body = self.visit(statement.statement)
+        self.__available = available
+
+        return rebuild_loop(statement, condition, body)
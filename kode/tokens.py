@@ -64,6 +64,10 @@ class Literal(Token):
 
     @property
     def enum_type(self) -> LiteralType:
+        return self.validate()
+
+    def validate(self) -> LiteralType:
+        # Malformed literals raise instead of resolving to a type.
         value = self.span.value
 
         if len(value) == 0:
@@ -306,7 +310,15 @@ class TokenStream:
         else:
             self.__tokens = tokens
         self.__ptr = offset
-    
+
+    @property
+    def tokens(self) -> List[Token]:
+        return self.__tokens
+
+    @property
+    def offset(self) -> int:
+        return self.__ptr
+
     @property
     def span(self) -> List[Span]:
         span = None
@@ -0,0 +1,562 @@
+from .statements import Common, Conditional, Constant, IdentifierStatement, Input, Invariant, LiteralStatement, Loop, Statement, Statements, Assignment, Operation, Show
+from .analysis import assigned_names
+from .runtime import NATIVE_OPERATORS, SHORT_CIRCUITS, OperandError, literal_type, parse_input, result_span
+from .tokens import OperatorType
+from .interpreter import Interpreter
+from .output import OutputSink
+from .frame import UNDEFINED
+from .errors import ParseError, InterpreterError
+from typing import Callable, Dict, List
+from functools import lru_cache
+import math
+import sys
+
+INDENT = "    "
+MAX_EXPRESSION_DEPTH = 64
+
+PYTHON_OPERATORS: Dict[OperatorType, str] = {
+    OperatorType.MINUS: "({} - {})",
+    OperatorType.TIMES: "({} * {})",
+    OperatorType.DIVIDE: "({} // {})",
+    OperatorType.MOD: "({} % {})",
+    OperatorType.EQUALS: "({} == {})",
+    OperatorType.GREATER: "({} > {})",
+    OperatorType.LESS: "({} < {})",
+    OperatorType.XOR: "({} ^ {})",
+    OperatorType.BAND: "({} & {})",
+    OperatorType.BOR: "({} | {})",
+    OperatorType.SHL: "({} << {})",
+    OperatorType.SHR: "({} >> {})",
+    OperatorType.PLUS: "_plus({}, {})",
+    OperatorType.AND: "({} and {})",
+    OperatorType.OR: "({} or {})"
+}
+
+# Operators whose native form checks operand types, written plainly once type inference proved the types.
+SPECIALIZED_PYTHON_OPERATORS: Dict[OperatorType, str] = {
+    OperatorType.PLUS: "({} + {})",
+    OperatorType.INDEX: "{}[{}]"
+}
+
+def is_expression(statement: Statement) -> bool:
+    statement_type = type(statement)
+
+    if statement_type in [LiteralStatement, Constant, IdentifierStatement, Input]:
+        return True
+    elif statement_type == Operation:
+        return is_expression(statement.lhs) and is_expression(statement.rhs)
+    elif statement_type == Invariant:
+        return is_expression(statement.statement)
+    elif statement_type == Common:
+        return not statement.first or is_expression(statement.statement)
+    else:
+        return False
+
+def python_literal(value: any) -> str:
+    if type(value) == float and not math.isfinite(value):
+        return f"float({str(value)!r})"
+
+    return repr(value)
+
+def identifiers(statement: Statement) -> List[IdentifierStatement]:
+    statement_type = type(statement)
+
+    if statement_type == IdentifierStatement:
+        return [statement]
+    elif statement_type == Operation:
+        return identifiers(statement.lhs) + identifiers(statement.rhs)
+    elif statement_type == Invariant:
+        return identifiers(statement.statement)
+    elif statement_type == Common:
+        return identifiers(statement.statement) if statement.first else []
+    elif statement_type in [Statements]:
+        return [i for s in statement for i in identifiers(s)]
+    elif statement_type in [Assignment, Show]:
+        return identifiers(statement.statements)
+    elif statement_type == Conditional:
+        found = identifiers(statement.condition) + identifiers(statement.pass_statement)
+
+        if statement.fail_statement:
+            found += identifiers(statement.fail_statement)
+
+        return found
+    elif statement_type == Loop:
+        return identifiers(statement.condition) + identifiers(statement.statement)
+    else:
+        return []
+
+class Program:
+    __source: str
+    __origins: List[Statement]
+    __line_map: Dict[int, Statement]
+
+    def __init__(self, source: str, origins: List[Statement], line_map: Dict[int, Statement]):
+        self.__source = source
+        self.__origins = origins
+        self.__line_map = line_map
+
+    @property
+    def source(self) -> str:
+        return self.__source
+
+    @property
+    def filename(self) -> str:
+        return "<kode>"
+
+    @property
+    def origins(self) -> List[Statement]:
+        return self.__origins
+
+    @property
+    def line_map(self) -> Dict[int, Statement]:
+        return self.__line_map
+
+    @property
+    def code(self):
+        return compile_source(self.__source, self.filename)
+
+    def __str__(self) -> str:
+        return f"Program({self.filename},{len(self.__line_map)})"
+
+    def __repr__(self) -> str:
+        return str(self)
+
+@lru_cache(maxsize=64)
+def compile_source(source: str, filename: str):
+    return compile(source, filename, "exec")
+
+class Transpiler:
+    __lines: List[str]
+    __line_map: Dict[int, Statement]
+    __origins: List[Statement]
+    __depths: Dict[int, int]
+    __indent: int
+    __temps: int
+    __count_skipped: bool
+
+    def __init__(self, count_skipped: bool = False):
+        self.__lines = []
+        self.__line_map = {}
+        self.__origins = []
+        self.__depths = {}
+        self.__indent = 1
+        self.__temps = 0
+        self.__count_skipped = count_skipped
+
+    def transpile(self, ast: Statement) -> Program:
+        self.__lines.append("def _kode(_v):")
+        result = self.temp()
+        self.emit(ast, result)
+        self.line(f"return {result}", ast)
+
+        return Program(
+            source="\n".join(self.__lines) + "\n",
+            origins=self.__origins,
+            line_map=self.__line_map
+        )
+
+    def temp(self, prefix: str = "_t") -> str:
+        self.__temps += 1
+
+        return f"{prefix}{self.__temps}"
+
+    def origin(self, statement: Statement) -> int:
+        self.__origins.append(statement)
+
+        return len(self.__origins) - 1
+
+    def line(self, code: str, origin: Statement):
+        self.__lines.append(INDENT * self.__indent + code)
+        self.__line_map[len(self.__lines)] = origin
+
+    def emit(self, statement: Statement, target: str):
+        emit_method = STATEMENT_TRANSPILERS.get(type(statement))
+
+        if emit_method == None:
+            raise InterpreterError(statement.span, "Cannot interpret statement.")
+
+        emit_method(self, statement, target)
+
+    def depth(self, statement: Statement) -> int:
+        depth = self.__depths.get(id(statement))
+
+        if depth == None:
+            depth = 0
+
+            if type(statement) == Operation:
+                depth = 1 + max(self.depth(statement.lhs), self.depth(statement.rhs))
+            elif type(statement) == Invariant or type(statement) == Common and statement.first:
+                depth = self.depth(statement.statement)
+
+            self.__depths[id(statement)] = depth
+
+        return depth
+
+    def value(self, statement: Statement) -> str:
+        if is_expression(statement):
+            return self.expression(statement)
+
+        target = self.temp()
+        self.emit(statement, target)
+
+        return target
+
+    def spill(self, statement: Statement) -> str:
+        target = self.temp()
+        self.emit_expression(statement, target)
+
+        return target
+
+    def spill_short_circuit(self, statement: Operation) -> str:
+        target = self.spill(statement.lhs)
+
+        # The right operand is only spilled under the test, so it still runs only when the left one does not decide.
+        self.line(f"if {'not ' if SHORT_CIRCUITS[statement.operator_type] else ''}{target}:", statement)
+        self.__indent += 1
+        self.emit_expression(statement.rhs, target)
+        self.__indent -= 1
+
+        if self.__count_skipped:
+            self.line("else:", statement)
+            self.__indent += 1
+            self.line(f"_skipped({self.origin(statement)}, {target})", statement)
+            self.__indent -= 1
+
+        return target
+
+    def expression(self, statement: Statement) -> str:
+        statement_type = type(statement)
+
+        if statement_type == LiteralStatement:
+            try:
+                value = statement.literal.value
+            except ParseError:
+                return f"_raise({self.origin(statement)})"
+
+            return python_literal(value)
+        elif statement_type == Constant:
+            return python_literal(statement.value)
+        elif statement_type == IdentifierStatement:
+            return f"_v[{statement.identifier.value!r}]"
+        elif statement_type == Input:
+            return f"_input({self.origin(statement)})"
+        elif statement_type == Operation:
+            # Python limits expression nesting, so deep chains are spilled into temporaries.
+            if self.depth(statement) > MAX_EXPRESSION_DEPTH:
+                if statement.operator_type in SHORT_CIRCUITS: return self.spill_short_circuit(statement)
+
+                lhs = self.spill(statement.lhs)
+                rhs = self.spill(statement.rhs)
+            else:
+                lhs = self.expression(statement.lhs)
+                rhs = self.expression(statement.rhs)
+
+            return self.operator(statement, lhs, rhs)
+        elif statement_type == Invariant:
+            name = f"_h{statement.index}"
+
+            return f"({name} if {name} is not _unset else ({name} := {self.expression(statement.statement)}))"
+        elif statement_type == Common:
+            name = f"_s{statement.index}"
+
+            if not statement.first: return name
+
+            return f"({name} := {self.expression(statement.statement)})"
+        else:
+            raise InterpreterError(statement.span, "Cannot interpret statement.")
+
+    def operator(self, statement: Operation, lhs: str, rhs: str) -> str:
+        operator = statement.operator_type
+
+        if not statement.operand_types == None and operator in SPECIALIZED_PYTHON_OPERATORS:
+            return SPECIALIZED_PYTHON_OPERATORS[operator].format(lhs, rhs)
+
+        if operator == OperatorType.INDEX:
+            return f"_index({lhs}, {rhs}, {self.origin(statement)})"
+
+        # Counting skipped right operands needs the deciding branch spelled out instead of Python's and/or.
+        if self.__count_skipped and operator in SHORT_CIRCUITS:
+            value = self.temp()
+            test = f"({value} := {lhs})" if SHORT_CIRCUITS[operator] else f"not ({value} := {lhs})"
+
+            return f"(_skipped({self.origin(statement)}, {value}) if {test} else {rhs})"
+
+        return PYTHON_OPERATORS[operator].format(lhs, rhs)
+
+    def emit_expression(self, statement: Statement, target: str):
+        code = self.expression(statement)
+
+        if target:
+            self.line(f"{target} = {code}", statement)
+        elif not type(statement) in [LiteralStatement, Constant]:
+            self.line(code, statement)
+
+    def emit_block(self, statement: Statement, target: str):
+        self.__indent += 1
+        size = len(self.__lines)
+
+        if statement:
+            self.emit(statement, target)
+        elif target:
+            self.line(f"{target} = None", statement)
+
+        if len(self.__lines) == size:
+            self.line("pass", statement)
+
+        self.__indent -= 1
+
+    def emit_statements(self, statement: Statements, target: str):
+        statements = list(statement)
+
+        if len(statements) == 0:
+            if target: self.line(f"{target} = ''", statement)
+            return
+
+        for s in statements[:-1]:
+            self.emit(s, None)
+
+        self.emit(statements[-1], target)
+
+    def emit_assignment(self, statement: Assignment, target: str):
+        value = self.value(statement.statements)
+        key = repr(statement.identifier.value)
+
+        if target:
+            self.line(f"{target} = _v[{key}] = {value}", statement)
+        else:
+            self.line(f"_v[{key}] = {value}", statement)
+
+    def emit_show(self, statement: Show, target: str):
+        value = self.value(statement.statements)
+
+        if target:
+            self.line(f"{target} = {value}", statement)
+            value = target
+
+        self.line(f"_show({value})", statement)
+
+    def push_scope(self, statement: Statement) -> Dict[str, str]:
+        markers = {}
+
+        if not statement.scoped: return markers
+
+        for name in sorted(assigned_names(statement)):
+            markers[name] = self.temp("_m")
+            self.line(f"{markers[name]} = {name!r} not in _v", statement)
+
+        return markers
+
+    def pop_scope(self, statement: Statement, markers: Dict[str, str]):
+        for name, marker in markers.items():
+            self.line(f"if {marker}: _v.pop({name!r}, None)", statement)
+
+    def emit_conditional(self, statement: Conditional, target: str):
+        markers = self.push_scope(statement)
+        origin = self.origin(statement)
+        condition = self.temp("_c")
+
+        taken, skipped = ("False", "True") if statement.negated else ("True", "False")
+
+        self.emit(statement.condition, condition)
+        self.line(f"if {condition} is {taken}:", statement)
+        self.emit_block(statement.pass_statement, target)
+        self.line(f"elif {condition} is {skipped}:", statement)
+        self.emit_block(statement.fail_statement, target)
+        self.line("else:", statement)
+        self.__indent += 1
+        self.line(f"_fail({origin}, {condition})", statement)
+        self.__indent -= 1
+
+        self.pop_scope(statement, markers)
+
+    def emit_loop(self, statement: Loop, target: str):
+        markers = self.push_scope(statement)
+        origin = self.origin(statement)
+        condition = self.temp("_c")
+
+        if target: self.line(f"{target} = None", statement)
+
+        for index in statement.invariants:
+            self.line(f"_h{index} = _unset", statement)
+
+        if not statement.induction == None:
+            self.emit_counted_loop(statement, target)
+            self.pop_scope(statement, markers)
+            return
+
+        self.line("while True:", statement)
+        self.__indent += 1
+        self.emit(statement.condition, condition)
+        self.line(f"if {condition} is not True:", statement)
+        self.__indent += 1
+        self.line(f"if {condition} is False: break", statement)
+        self.line(f"_fail({origin}, {condition})", statement)
+        self.__indent -= 1
+        self.emit(statement.statement, target)
+        self.__indent -= 1
+
+        self.pop_scope(statement, markers)
+
+    def emit_counted_loop(self, statement: Loop, target: str):
+        induction = statement.induction
+        condition = induction.condition
+        increment = induction.increment
+        key = repr(induction.counter.value)
+        counter = self.temp("_i")
+        bound = self.temp("_b")
+
+        # The counter and the bound are read once, in the order of the condition.
+        if induction.counter_first:
+            self.line(f"{counter} = _v[{key}]", statement)
+            self.emit(induction.bound, bound)
+        else:
+            self.emit(induction.bound, bound)
+            self.line(f"{counter} = _v[{key}]", statement)
+
+        store = f"{target} = _v[{key}]" if target else f"_v[{key}]"
+
+        # Proven integers counting up are exactly a range, the counter is stored one step ahead like the original loop.
+        if induction.ascending and not condition.operand_types == None and not increment.operand_types == None:
+            self.line(f"for {counter} in range({counter}, {bound}, {induction.step}):", statement)
+            self.__indent += 1
+            self.emit(induction.body, None)
+            self.line(f"{store} = {counter} + {induction.step}", statement)
+            self.__indent -= 1
+            return
+
+        if induction.counter_first:
+            test = self.operator(condition, counter, bound)
+        else:
+            test = self.operator(condition, bound, counter)
+
+        self.line(f"while {test}:", statement)
+        self.__indent += 1
+        self.emit(induction.body, None)
+        self.line(f"{store} = {counter} = {self.operator(increment, counter, repr(induction.step))}", statement)
+        self.__indent -= 1
+
+STATEMENT_TRANSPILERS: Dict[type, Callable[[Transpiler, Statement, str], None]] = {
+    Statements: Transpiler.emit_statements,
+    Conditional: Transpiler.emit_conditional,
+    Loop: Transpiler.emit_loop,
+    Assignment: Transpiler.emit_assignment,
+    Operation: Transpiler.emit_expression,
+    Show: Transpiler.emit_show,
+    LiteralStatement: Transpiler.emit_expression,
+    Constant: Transpiler.emit_expression,
+    Invariant: Transpiler.emit_expression,
+    Common: Transpiler.emit_expression,
+    IdentifierStatement: Transpiler.emit_expression,
+    Input: Transpiler.emit_expression
+}
+
+def transpile(ast: Statement, count_skipped: bool = False) -> Program:
+    return Transpiler(count_skipped).transpile(ast)
+
+class PythonInterpreter(Interpreter):
+    __program: Program
+    __variables: Dict[str, any]
+    __debug: bool
+
+    def __init__(self, ast: Statements, silent: bool = False, debug: bool = False, input_method: Callable[[], str] = input, output: OutputSink = None):
+        super().__init__(ast, silent=silent, debug=debug, input_method=input_method, output=output)
+        self.__program = None
+        self.__variables = {}
+        self.__debug = debug
+
+    def compile(self, ast: Statement) -> Program:
+        if ast is self.ast and self.__program != None:
+            return self.__program
+
+        program = transpile(ast, count_skipped=self.__debug)
+
+        if ast is self.ast:
+            self.__program = program
+
+        if self.__debug:
+            print(program.source)
+            print("|")
+
+        return program
+
+    def run(self, ast: Statement = None) -> any:
+        if ast == None: ast = self.ast
+
+        program = self.compile(ast)
+
+        try:
+            code = program.code
+        except (SyntaxError, RecursionError):
+            raise InterpreterError(result_span(ast), "Program is too deeply nested to transpile.")
+
+        environment = self.environment(program)
+        exec(code, environment)
+
+        try:
+            return environment["_kode"](self.__variables)
+        except KeyError as err:
+            raise self.undefined_error(program, err) from None
+
+    def environment(self, program: Program) -> Dict[str, any]:
+        origins = program.origins
+
+        def show(value: any):
+            self.display(value)
+
+        def read(index: int) -> any:
+            return parse_input(self.read(), origins[index].span)
+
+        def index(lhs: any, rhs: any, origin: int) -> any:
+            try:
+                return NATIVE_OPERATORS[OperatorType.INDEX](lhs, rhs)
+            except OperandError as err:
+                operation = origins[origin]
+                operand = operation.rhs if err.operand else operation.lhs
+
+                raise InterpreterError(result_span(operand), str(err))
+
+        def fail(origin: int, value: any):
+            statement = origins[origin]
+            kind = "loop conditional" if type(statement) == Loop else "conditional"
+
+            raise InterpreterError(result_span(statement.condition), f"Cannot perform {kind} with {literal_type(value)}.")
+
+        def skipped(origin: int, value: any) -> any:
+            self.skipped[origins[origin].operator_type] += 1
+
+            return value
+
+        def raise_error(origin: int):
+            origins[origin].literal.value
+
+        return {
+            "_plus": NATIVE_OPERATORS[OperatorType.PLUS],
+            "_index": index,
+            "_show": show,
+            "_input": read,
+            "_fail": fail,
+            "_raise": raise_error,
+            "_skipped": skipped,
+            "_unset": UNDEFINED
+        }
+
+    def undefined_error(self, program: Program, error: KeyError) -> Exception:
+        name = error.args[0]
+        traceback = sys.exc_info()[2]
+        line = None
+
+        while traceback:
+            if traceback.tb_frame.f_code.co_filename == program.filename:
+                line = traceback.tb_lineno
+
+            traceback = traceback.tb_next
+
+        origin = program.line_map.get(line)
+
+        if origin == None: return error
+
+        for statement in identifiers(origin):
+            if statement.identifier.value == name:
+                return InterpreterError(statement.identifier.span, f"Variable {name} not defined.")
+
+        return error
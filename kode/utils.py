@@ -1,9 +1,16 @@
 from .span import Span
+from typing import Dict
 
 def print_span(span: Span):
     file_path = span.file_path 
-    with open(file_path) as h:
-        source = h.read()
+    source = span.source
+
+    # Statements the optimizer removed entirely leave a span with no file to point into.
+    if source == None and file_path == None: return
+
+    if source == None:
+        with open(file_path) as h:
+            source = h.read()
 
     source_pointers = [False] * len(source)
 
@@ -23,3 +30,11 @@ def print_span(span: Span):
             print("|" + " " * (len(line_num) + 1), ''.join("^" if p else " " for p in ptrs))
 
         start = end
+
+def print_statistics(statistics: Dict[str, any]):
+    print("| Statistics:")
+
+    for name, value in statistics.items():
+        print(f"|   {name}: {value}")
+
+    print("|")
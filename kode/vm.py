@@ -0,0 +1,227 @@
+from .statements import Loop, Statement, Statements
+from .compiler import Bytecode, Opcode, compile_bytecode
+from .runtime import NATIVE_OPERATORS, SHORT_CIRCUITS, SPECIALIZED_OPERATORS, OperandError, checked_operator_function, literal_type, parse_input, result_span
+from .interpreter import Interpreter
+from .output import OutputSink
+from .frame import UNDEFINED
+from .errors import InterpreterError
+from typing import Callable
+
+class VirtualMachine(Interpreter):
+    __bytecode: Bytecode
+    __debug: bool
+
+    def __init__(self, ast: Statements, silent: bool = False, debug: bool = False, input_method: Callable[[], str] = input, output: OutputSink = None):
+        super().__init__(ast, silent=silent, debug=debug, input_method=input_method, output=output)
+        self.__bytecode = None
+        self.__debug = debug
+
+    def compile(self, ast: Statement) -> Bytecode:
+        if ast is self.ast and self.__bytecode != None:
+            return self.__bytecode
+
+        bytecode = compile_bytecode(ast)
+
+        if ast is self.ast:
+            self.__bytecode = bytecode
+
+        if self.__debug:
+            print(bytecode.disassemble())
+            print("|")
+
+        return bytecode
+
+    def run(self, ast: Statement = None) -> any:
+        if ast == None: ast = self.ast
+
+        return self.execute(self.compile(ast))
+
+    def link(self, opcode: Opcode, arg: any) -> any:
+        if opcode == Opcode.BINARY_OP:
+            if type(arg) == tuple: return SPECIALIZED_OPERATORS[arg][0]
+
+            return NATIVE_OPERATORS[arg]
+        elif opcode == Opcode.LOAD_VAR or opcode == Opcode.STORE_VAR:
+            return self.scope.slot(arg)
+        elif opcode == Opcode.LOAD_INVARIANT:
+            return (self.scope.temporary(arg[0]), arg[1])
+        elif opcode == Opcode.STORE_TEMPORARY or opcode == Opcode.LOAD_TEMPORARY:
+            return self.scope.temporary(arg)
+        elif opcode == Opcode.RESET_INVARIANTS:
+            return [self.scope.temporary(index) for index in arg]
+        elif opcode == Opcode.UPDATE_CONST:
+            return (self.scope.slot(arg.identifier), checked_operator_function(arg.operation), arg.constant, arg.kind)
+        elif opcode == Opcode.UPDATE:
+            return (self.scope.slot(arg.identifier), checked_operator_function(arg.operation), arg.kind)
+        elif opcode == Opcode.JUMP_IF_DECIDED:
+            operator, target = arg
+
+            return (SHORT_CIRCUITS[operator], operator, target)
+        elif opcode == Opcode.TEST_COUNTED:
+            counter, condition, counter_first, exit = arg
+
+            return (self.scope.slot(counter), checked_operator_function(condition), counter_first, exit)
+        elif opcode == Opcode.STEP_COUNTED:
+            counter, increment, step, loop_start = arg
+
+            return (self.scope.slot(counter), checked_operator_function(increment), step, loop_start)
+
+        return arg
+
+    def execute(self, bytecode: Bytecode) -> any:
+        opcodes = bytecode.opcodes
+        args = [self.link(opcode, arg) for opcode, arg in zip(opcodes, bytecode.args)]
+
+        LOAD_CONST = Opcode.LOAD_CONST
+        LOAD_VAR = Opcode.LOAD_VAR
+        STORE_VAR = Opcode.STORE_VAR
+        UPDATE_CONST = Opcode.UPDATE_CONST
+        UPDATE = Opcode.UPDATE
+        JUMP_IF_DECIDED = Opcode.JUMP_IF_DECIDED
+        BINARY_OP = Opcode.BINARY_OP
+        JUMP_IF_FALSE = Opcode.JUMP_IF_FALSE
+        JUMP_IF_TRUE = Opcode.JUMP_IF_TRUE
+        JUMP = Opcode.JUMP
+        SHOW = Opcode.SHOW
+        INPUT = Opcode.INPUT
+        POP = Opcode.POP
+        PUSH_SCOPE = Opcode.PUSH_SCOPE
+        POP_SCOPE = Opcode.POP_SCOPE
+        RAISE = Opcode.RAISE
+        LOAD_INVARIANT = Opcode.LOAD_INVARIANT
+        STORE_TEMPORARY = Opcode.STORE_TEMPORARY
+        LOAD_TEMPORARY = Opcode.LOAD_TEMPORARY
+        RESET_INVARIANTS = Opcode.RESET_INVARIANTS
+        ENTER_COUNTED = Opcode.ENTER_COUNTED
+        TEST_COUNTED = Opcode.TEST_COUNTED
+        STEP_COUNTED = Opcode.STEP_COUNTED
+        EXIT_COUNTED = Opcode.EXIT_COUNTED
+
+        scope = self.scope
+        values = scope.values
+        load = scope.load
+        store = scope.store
+        display = self.display
+        fused = self.fused
+        skipped = self.skipped
+
+        stack = []
+        push = stack.append
+        pop = stack.pop
+
+        pc = 0
+        end = len(opcodes)
+
+        try:
+            while pc < end:
+                opcode = opcodes[pc]
+                arg = args[pc]
+                pc += 1
+
+                if opcode == LOAD_VAR:
+                    value = values[arg]
+
+                    if value is UNDEFINED: load(arg, bytecode.args[pc - 1])
+
+                    push(value)
+                elif opcode == LOAD_CONST:
+                    push(arg)
+                elif opcode == BINARY_OP:
+                    rhs = pop()
+                    stack[-1] = arg(stack[-1], rhs)
+                elif opcode == STORE_VAR:
+                    store(arg, stack[-1])
+                elif opcode == UPDATE_CONST:
+                    slot, function, constant, kind = arg
+                    value = values[slot]
+
+                    if value is UNDEFINED: load(slot, bytecode.args[pc - 1].identifier)
+
+                    value = values[slot] = function(value, constant)
+                    fused[kind] += 1
+                    push(value)
+                elif opcode == UPDATE:
+                    slot, function, kind = arg
+                    rhs = pop()
+                    stack[-1] = values[slot] = function(stack[-1], rhs)
+                    fused[kind] += 1
+                elif opcode == LOAD_INVARIANT:
+                    value = values[arg[0]]
+
+                    if not value is UNDEFINED:
+                        push(value)
+                        pc = arg[1]
+                elif opcode == STORE_TEMPORARY:
+                    values[arg] = stack[-1]
+                elif opcode == LOAD_TEMPORARY:
+                    push(values[arg])
+                elif opcode == JUMP_IF_FALSE:
+                    value = pop()
+
+                    if not type(value) == bool:
+                        origin = bytecode.origins[pc - 1]
+                        kind = "loop conditional" if type(origin) == Loop else "conditional"
+
+                        raise InterpreterError(result_span(origin.condition), f"Cannot perform {kind} with {literal_type(value)}.")
+
+                    if not value: pc = arg
+                elif opcode == JUMP_IF_TRUE:
+                    value = pop()
+
+                    if not type(value) == bool:
+                        raise InterpreterError(result_span(bytecode.origins[pc - 1].condition), f"Cannot perform conditional with {literal_type(value)}.")
+
+                    if value: pc = arg
+                elif opcode == JUMP_IF_DECIDED:
+                    decided, operator, target = arg
+
+                    if bool(stack[-1]) == decided:
+                        skipped[operator] += 1
+                        pc = target
+                    else:
+                        pop()
+                elif opcode == JUMP:
+                    pc = arg
+                elif opcode == POP:
+                    pop()
+                elif opcode == PUSH_SCOPE:
+                    scope.push()
+                elif opcode == POP_SCOPE:
+                    scope.pop()
+                elif opcode == SHOW:
+                    display(stack[-1])
+                elif opcode == INPUT:
+                    push(parse_input(self.read(), arg))
+                elif opcode == RAISE:
+                    raise arg
+                elif opcode == RESET_INVARIANTS:
+                    for slot in arg:
+                        values[slot] = UNDEFINED
+                elif opcode == ENTER_COUNTED:
+                    # The loop value starts as None above the bound.
+                    if arg: stack[-2] = stack[-1]
+                    stack[-1] = None
+                elif opcode == TEST_COUNTED:
+                    slot, compare, counter_first, exit = arg
+                    counter = values[slot]
+                    bound = stack[-2]
+
+                    if compare(counter, bound) if counter_first else compare(bound, counter):
+                        pop()
+                    else:
+                        pc = exit
+                elif opcode == STEP_COUNTED:
+                    slot, advance, step, loop_start = arg
+                    stack[-1] = values[slot] = advance(values[slot], step)
+                    pc = loop_start
+                elif opcode == EXIT_COUNTED:
+                    del stack[-2]
+                else:
+                    raise InterpreterError(bytecode.span(pc - 1), f"Unknown opcode {opcode}.")
+        except OperandError as err:
+            origin = bytecode.origins[pc - 1]
+            operand = origin.rhs if err.operand else origin.lhs
+
+            raise InterpreterError(result_span(operand), str(err))
+
+        return pop()
@@ -1,31 +1,83 @@
 import argparse
-from kode import parse, interpret
+import sys
+from contextlib import ExitStack
+from kode import parse, parse_cached, interpret, interpret_stream, ENGINES, MAX_UNROLLED_TRIPS, StreamSink, FileSource, ReplaySource, RecordingSource
 
 def main():
     parser = argparse.ArgumentParser(description="Run Kode")
     parser.add_argument("--ast", action='store_true', help="Prints the AST representation of the code.")
     parser.add_argument("--debug", action='store_true', help="Prints interpreter operations.")
+    parser.add_argument("--engine", choices=ENGINES.keys(), default="tree", help="Execution engine used to run the code.")
+    parser.add_argument("--stream", action='store_true', help="Parses and runs top-level statements one at a time while reading the file.")
+    parser.add_argument("--output-buffer", type=int, default=None, help="Characters of output buffered before writing, 0 writes every line. Defaults to line output on a terminal.")
+    parser.add_argument("--replay", help="Reads INPUT values from a file recorded with --record instead of stdin.")
+    parser.add_argument("--record", help="Records every INPUT value to a file that --replay can read back.")
+    parser.add_argument("--no-opt", action='store_true', help="Runs the program without optimizations.")
+    parser.add_argument("--unroll", type=int, default=MAX_UNROLLED_TRIPS, help="Largest constant trip count of a loop the optimizer copies out, 0 never unrolls.")
+    parser.add_argument("--no-cache", action='store_true', help="Always parses the source instead of loading a cached program.")
+    parser.add_argument("--cache-dir", default=None, help="Directory holding cached programs, defaults to a .kodec file next to the source.")
     parser.add_argument("file", help="File to interpret.")
     args = parser.parse_args()
 
     file_path = args.file
-    with open(args.file) as h:
-        source = h.read()
+    buffer_size = args.output_buffer
 
-    if len(source.strip()) == 0: return
+    if buffer_size == None:
+        # Debug traces are interleaved with the program output, so it is never delayed.
+        buffer_size = 0 if args.debug or sys.stdout.isatty() else 1 << 16
 
-    AST = parse(source, file_path)
+    output = StreamSink(sys.stdout, buffer_size=buffer_size)
 
-    if AST == None: return
+    if args.replay:
+        with open(args.replay) as h:
+            input_source = ReplaySource(h)
+    else:
+        input_source = FileSource(sys.stdin)
 
-    if args.ast: print(AST)
+    with ExitStack() as stack:
+        if args.record:
+            input_source = RecordingSource(input_source, stack.enter_context(open(args.record, "w")))
 
-    result = interpret(
-        ast=AST, 
-        debug=args.debug
-    )
+        if args.stream:
+            with open(file_path) as h:
+                interpret_stream(
+                    reader=h,
+                    file_path=file_path,
+                    debug=args.debug,
+                    engine=args.engine,
+                    input_method=input_source,
+                    output=output,
+                    optimize=not args.no_opt,
+                    unroll_limit=args.unroll
+                )
 
-    if result == None: return
+            return
+
+        with open(args.file) as h:
+            source = h.read()
+
+        if len(source.strip()) == 0: return
+
+        if args.no_cache:
+            AST = parse(source, file_path)
+        else:
+            AST = parse_cached(source, file_path, args.cache_dir)
+
+        if AST == None: return
+
+        if args.ast: print(AST)
+
+        result = interpret(
+            ast=AST, 
+            debug=args.debug,
+            engine=args.engine,
+            input_method=input_source,
+            output=output,
+            optimize=not args.no_opt,
+            unroll_limit=args.unroll
+        )
+
+        if result == None: return
 
 if __name__ == "__main__":
     main()
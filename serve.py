@@ -1,9 +1,27 @@
-from kode import statementize, tokenize, spanize, Interpreter
+from kode import ENGINES, BufferSink, DequeSource, ProgramCache
 from kode.errors import handle_error, KodeError
 from flask import Flask, render_template, request
+import argparse
 import os
+import threading
 
 app = Flask(__name__)
+app.config["ENGINE"] = os.environ.get("KODE_ENGINE", "tree")
+app.config["CACHE_PROGRAMS"] = int(os.environ.get("KODE_CACHE_PROGRAMS", 256))
+app.config["CACHE_SIZE"] = int(os.environ.get("KODE_CACHE_SIZE", 64 << 20))
+app.config["PROGRAMS"] = None
+
+programs_lock = threading.Lock()
+
+def program_cache() -> ProgramCache:
+    # The cache is built on first use, once the command line had a chance to change its bounds.
+    with programs_lock:
+        if app.config["PROGRAMS"] == None:
+            programs = ProgramCache(max_programs=app.config["CACHE_PROGRAMS"], max_size=app.config["CACHE_SIZE"], optimize=True)
+            programs.warm("./examples", "web")
+            app.config["PROGRAMS"] = programs
+
+    return app.config["PROGRAMS"]
 
 @app.route("/")
 def index():
@@ -32,19 +50,15 @@ def kode():
 @app.route("/playground", methods=["POST"])
 def kode_post():
     interpreter = None
-    try:
-        user_input = request.form["input"].split("\n")
+    # Browsers submit CRLF line breaks, the examples the cache is warmed with use LF.
+    code = request.form["code"].replace("\r\n", "\n")
 
-        def get_input() -> str:
-            if len(user_input) == 0:
-                return None
-            return user_input.pop(0).strip()
+    try:
+        user_input = DequeSource(line.strip() for line in request.form["input"].split("\n"))
 
         error = False
-        spans = spanize(request.form["code"], "web")
-        tokens = tokenize(spans)
-        ast = statementize(tokens)
-        interpreter = Interpreter(ast, silent=True, input_method=get_input)
+        ast = program_cache().get(code, "web")
+        interpreter = ENGINES[app.config["ENGINE"]](ast, input_method=user_input, output=BufferSink())
         interpreter.run()
         output = interpreter.stdout
     except Exception as err:
@@ -58,7 +72,7 @@ def kode_post():
             output = ""
         output += f"|\n| {err.__class__.__name__}: " + str(err) + "\n|\n"
         span = err.span
-        source = request.form['code']
+        source = code
         source_pointers = [False] * len(source)
 
         for i in range(span.start, span.end):
@@ -79,5 +93,19 @@ def kode_post():
             start = end
     return render_template("playground.html", code=request.form["code"], input=request.form["input"], output=output, error=error)
 
+@app.route("/cache")
+def cache():
+    return program_cache().statistics
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve Kode")
+    parser.add_argument("--engine", choices=ENGINES.keys(), default=app.config["ENGINE"], help="Execution engine used to run the code.")
+    parser.add_argument("--cache-programs", type=int, default=app.config["CACHE_PROGRAMS"], help="Number of parsed programs kept in memory.")
+    parser.add_argument("--cache-size", type=int, default=app.config["CACHE_SIZE"], help="Estimated bytes of parsed programs kept in memory.")
+    args = parser.parse_args()
+
+    app.config["ENGINE"] = args.engine
+    app.config["CACHE_PROGRAMS"] = args.cache_programs
+    app.config["CACHE_SIZE"] = args.cache_size
+
     app.run(port=5000)
\ No newline at end of file
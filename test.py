@@ -1,12 +1,29 @@
 import argparse
-from kode import statementize, tokenize, spanize, Interpreter
+from kode import parse_tokens, lex, optimize, statementize_stream, StreamLexer, Optimizer, ENGINES, BufferSink, DequeSource
+from kode.statements import Statement, Statements
+import io
 import glob
+import sys
 import os.path
 import time
 
+def annotated(statement: Statement) -> bool:
+    if type(statement) == Statements: return any(annotated(s) for s in statement)
+
+    if not getattr(statement, "operand_types", None) == None: return True
+    if not getattr(statement, "update", None) == None: return True
+
+    children = [getattr(statement, name, None) for name in ["lhs", "rhs", "statements", "condition", "pass_statement", "fail_statement", "statement"]]
+
+    return any(annotated(child) for child in children if isinstance(child, Statement))
+
 def main():
     parser = argparse.ArgumentParser(description="UnitTest Kode")
     parser.add_argument("--new", "-n", action='store_true', help="Added or resets unit test values.")
+    parser.add_argument("--no-opt", action='store_true', help="Runs the tests without optimizations.")
+    parser.add_argument("--debug", "-d", action='store_true', help="Runs the tests with interpreter operations printed.")
+    parser.add_argument("--stream", "-s", action='store_true', help="Parses and runs top-level statements one at a time like run.py --stream.")
+    parser.add_argument("--engine", "-e", choices=ENGINES.keys(), default="tree", help="Execution engine used to run the tests.")
     args = parser.parse_args()
 
     test_files = glob.glob("./tests/*.kode")
@@ -29,11 +46,28 @@ def main():
             pass
 
         try:
-            spans = spanize(source, path)
-            tokens = tokenize(spans)
-            ast = statementize(tokens)
-            interpreter = Interpreter(ast, silent=True)
-            interpreter.run()
+            if args.stream:
+                interpreter = ENGINES[args.engine](Statements([]), debug=args.debug, input_method=DequeSource(), output=BufferSink())
+                optimizer = Optimizer(propagate=False)
+
+                for statement in statementize_stream(StreamLexer(io.StringIO(source), path).tokens()):
+                    if not args.no_opt: statement = optimizer.optimize(statement)
+
+                    interpreter.prepare(statement)
+                    interpreter.run(statement)
+            else:
+                tokens = lex(source, path)
+                ast = parse_tokens(tokens)
+
+                if not args.no_opt:
+                    parsed = ast
+                    ast = optimize(parsed)
+
+                    # Optimized nodes are rebuilt, so the parsed tree can still be run as written.
+                    if annotated(parsed): raise Exception("Optimizer changed the parsed tree.")
+
+                interpreter = ENGINES[args.engine](ast, debug=args.debug, input_method=DequeSource(), output=BufferSink())
+                interpreter.run()
 
             if args.new:
                 result = interpreter.stdout
@@ -56,6 +90,7 @@ def main():
 
     if len(test_fails) > 0:
         print(f"Fail: {', '.join(test_fails)}")
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()